@@ -0,0 +1,276 @@
+"""
+Stream the microphone to Deepgram live transcription.
+
+Audio is sent chunk by chunk while the user speaks, so the transcript is ready
+moments after they stop instead of after a fixed recording window.
+"""
+import atexit
+import queue
+from array import array
+import threading
+import time
+from contextlib import contextmanager
+
+import pyaudio
+from deepgram import DeepgramClient, LiveOptions, LiveTranscriptionEvents
+
+RATE = 16000
+CHUNK = 1024
+CHANNELS = 1
+FORMAT = pyaudio.paInt16
+
+# How long to wait for the last final transcript once the mic is closed
+FINAL_GRACE = 1.0
+
+# Short commands come back faster from nova-2
+MODEL = "nova-2"
+
+# Mean absolute sample value above which a chunk counts as speech
+SPEECH_LEVEL = 200
+# Consecutive loud chunks (64 ms each) before the sound counts as speech,
+# so a click or the tail of a prompt doesn't start the silence timer
+SPEECH_CHUNKS = 3
+# Stop streaming after this long of local quiet once speech has been heard
+SILENCE_STOP = 0.8
+
+# Longest wait for the next captured chunk before giving up on the device
+CHUNK_WAIT = 1.0
+
+# One client, one PyAudio and one input stream for the whole session
+_client = None
+_audio = None
+_stream = None
+_chunks = queue.Queue()  # Filled by PortAudio's capture thread
+_open_lock = threading.Lock()
+
+
+def _capture(in_data, frame_count, time_info, status):
+    """PyAudio stream callback: hand each captured chunk to whoever is listening"""
+    _chunks.put(in_data)
+    return (None, pyaudio.paContinue)
+
+
+def shared_client():
+    """The process-wide DeepgramClient (reads DEEPGRAM_API_KEY from the environment)"""
+    global _client
+    if _client is None:
+        _client = DeepgramClient()
+    return _client
+
+
+def open_microphone():
+    """
+    Open the shared input stream (stopped) if it is not open yet.
+    
+    Initializing PortAudio and the device takes a noticeable moment, so
+    callers can do it ahead of time on a background thread.
+    """
+    global _audio, _stream
+    with _open_lock:
+        if _stream is None:
+            _audio = pyaudio.PyAudio()
+            _stream = _audio.open(
+                format=FORMAT,
+                channels=CHANNELS,
+                rate=RATE,
+                input=True,
+                frames_per_buffer=CHUNK,
+                stream_callback=_capture,
+                start=False
+            )
+
+
+@contextmanager
+def microphone():
+    """
+    Yield a queue of captured chunks, with the shared stream running only
+    while the caller uses it.
+
+    The stream is opened on first use and just started and stopped after that,
+    so each question or move skips re-initializing the audio device. Capture
+    runs in PortAudio's own thread through a callback, so a slow consumer
+    never makes the device drop samples.
+    """
+    open_microphone()
+    # Drop anything captured after the previous user stopped listening
+    while not _chunks.empty():
+        _chunks.get_nowait()
+    _stream.start_stream()
+    try:
+        yield _chunks
+    finally:
+        _stream.stop_stream()
+
+
+def level(pcm):
+    """Mean absolute amplitude of 16-bit PCM - a cheap loudness measure"""
+    samples = array('h', pcm)
+    if not samples:
+        return 0
+    return sum(map(abs, samples)) / len(samples)
+
+
+def transcription_options(model=MODEL, fast=True):
+    """
+    Options shared by live and prerecorded requests.
+
+    fast turns off smart formatting and punctuation, which only add latency:
+    the parsers read spoken words and strip punctuation anyway. Numerals stay
+    on so "twelve" still arrives as "12" for the number prompts.
+    """
+    return {
+        "model": model,
+        "language": "en-US",
+        "smart_format": not fast,
+        "punctuate": not fast,
+        "numerals": fast,
+    }
+
+
+def record(seconds):
+    """
+    Record a fixed window from the microphone as raw 16-bit PCM.
+
+    The buffer is allocated once at full size and each chunk is copied into
+    place, instead of collecting a list of chunks and joining them afterwards.
+    """
+    chunk_bytes = CHUNK * CHANNELS * pyaudio.get_sample_size(FORMAT)
+    pcm = bytearray(int(RATE / CHUNK * seconds) * chunk_bytes)
+    view = memoryview(pcm)
+    filled = 0
+    with microphone() as chunks:
+        while filled < len(pcm):
+            data = chunks.get(timeout=CHUNK_WAIT)
+            size = min(len(data), len(pcm) - filled)
+            view[filled:filled + size] = data[:size]
+            filled += size
+    return pcm
+
+
+@atexit.register
+def close_microphone():
+    """Release the audio device (runs at exit)"""
+    global _audio, _stream
+    if _stream is not None:
+        _stream.close()
+        _stream = None
+    if _audio is not None:
+        _audio.terminate()
+        _audio = None
+
+
+class LiveListener:
+    """
+    One Deepgram live connection, opened up front and used for a single phrase.
+
+    Opening the connection is a network round-trip of its own, so it can be
+    done in the background (for instance while a prompt is still playing) and
+    listen() then streams audio the moment it is called.
+
+    With accept, every finalized transcript (joined with the earlier ones) is
+    passed to accept(text) and listening stops once it returns something
+    truthy. Without it, listening also stops at Deepgram's end of phrase
+    (speech_final). Either way it stops once Deepgram reports the utterance
+    has ended, or the microphone has been quiet for SILENCE_STOP after
+    speech, rather than running out the whole timeout. Interim hypotheses
+    are never used.
+    """
+
+    def __init__(self, client, accept=None, **options):
+        """options are passed to transcription_options()"""
+        self.accept = accept
+        self.finals = []
+        self.accepted = None
+        self.heard_words = False  # Deepgram has transcribed something, even an interim guess
+        self.done = threading.Event()
+
+        self.connection = client.listen.live.v("1")
+        self.connection.on(LiveTranscriptionEvents.Transcript, self._on_transcript)
+        self.connection.on(LiveTranscriptionEvents.UtteranceEnd, self._on_utterance_end)
+
+        options = LiveOptions(
+            **transcription_options(**options),
+            encoding="linear16",
+            sample_rate=RATE,
+            channels=CHANNELS,
+            interim_results=True,
+            endpointing=300,
+            utterance_end_ms="1000",
+            vad_events=True,
+        )
+        if not self.connection.start(options):
+            raise RuntimeError("Could not open Deepgram live connection")
+
+    def _on_transcript(self, _client, result, **kwargs):
+        if self.done.is_set():
+            return
+        transcript = result.channel.alternatives[0].transcript.strip()
+        if transcript:
+            self.heard_words = True
+        if not result.is_final:
+            return
+        if transcript:
+            self.finals.append(transcript)
+            if self.accept is not None:
+                accepted = self.accept(" ".join(self.finals))
+                if accepted:
+                    self.accepted = accepted
+                    self.done.set()
+                    return
+        # Deepgram's endpointing marks the end of the phrase
+        if self.accept is None and self.finals and result.speech_final:
+            self.done.set()
+
+    def _on_utterance_end(self, _client, *args, **kwargs):
+        # The speaker has finished; nothing more is coming for this phrase
+        if self.finals:
+            self.done.set()
+
+    def listen(self, timeout):
+        """
+        Stream the microphone until the phrase is finished, then close the connection.
+
+        Returns:
+            tuple: (transcript, accepted) - transcript is None if nothing was heard,
+            accepted is the last truthy value returned by accept (or None)
+        """
+        try:
+            with microphone() as chunks:
+                deadline = time.monotonic() + timeout
+                heard_speech = False
+                loud_run = 0
+                quiet_since = None
+                while not self.done.is_set() and time.monotonic() < deadline:
+                    chunk = chunks.get(timeout=CHUNK_WAIT)
+                    self.connection.send(chunk)
+                    
+                    # Local end-of-speech check, independent of network latency.
+                    # Timing starts only after sustained sound or a transcript
+                    if level(chunk) >= SPEECH_LEVEL:
+                        loud_run += 1
+                        quiet_since = None
+                        if loud_run >= SPEECH_CHUNKS:
+                            heard_speech = True
+                        continue
+                    loud_run = 0
+                    if heard_speech or self.heard_words:
+                        now = time.monotonic()
+                        if quiet_since is None:
+                            quiet_since = now
+                        elif now - quiet_since >= SILENCE_STOP:
+                            break
+        finally:
+            # Give Deepgram a moment to finalize what was already sent
+            self.done.wait(FINAL_GRACE)
+            self.connection.finish()
+
+        return (" ".join(self.finals) or None), self.accepted
+
+    def close(self):
+        """Close a connection that will not be listened on after all"""
+        self.connection.finish()
+
+
+def listen_live(client, timeout, accept=None, **options):
+    """Open a live connection, stream one phrase to it and return (transcript, accepted)"""
+    return LiveListener(client, accept, **options).listen(timeout)
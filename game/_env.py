@@ -0,0 +1,9 @@
+"""
+Load .env into the environment once for the whole package.
+
+Modules import this instead of calling load_dotenv() themselves, so the file
+is found and parsed a single time however many modules read settings.
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
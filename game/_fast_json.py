@@ -0,0 +1,23 @@
+"""
+Parse Lichess event streams with orjson when it is installed.
+
+berserk decodes every line of a streamed response with json.loads. Pointing
+berserk.formats at orjson.loads makes each gameState event cheaper to parse;
+without orjson nothing changes.
+"""
+import json
+import types
+
+import berserk.formats
+try:
+    import orjson  # Optional faster JSON parser
+except ImportError:
+    orjson = None
+
+
+def install_fast_json():
+    """Make berserk parse streamed events with orjson. Safe to call more than once."""
+    if orjson is None or berserk.formats.json.loads is orjson.loads:
+        return
+    # berserk.formats only sees this namespace; the real json module is untouched
+    berserk.formats.json = types.SimpleNamespace(**{**vars(json), "loads": orjson.loads})
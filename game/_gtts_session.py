@@ -0,0 +1,52 @@
+"""
+Reuse HTTPS connections for every Google TTS request.
+
+gTTS wraps each request in `with requests.Session() as s:`, which pays a new
+TCP + TLS handshake for every prompt. Pointing gtts.tts at sessions that
+survive the `with` block keeps the connections alive between prompts.
+
+Prompts are synthesized from several threads at once and requests.Session is
+not thread-safe, so each thread gets its own session. They all mount one
+HTTPAdapter, whose urllib3 pool is, so the connections are still shared.
+"""
+import threading
+import types
+
+import requests
+from requests.adapters import HTTPAdapter
+import gtts.tts
+
+# Enough for the game's synthesis workers and the setup prefetch at once
+POOL_SIZE = 8
+
+ADAPTER = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+
+
+class _PersistentSession(requests.Session):
+    """A requests session that ignores gTTS closing it after each request."""
+
+    def __init__(self):
+        super().__init__()
+        self.mount("https://", ADAPTER)
+
+    def __exit__(self, *args):
+        pass
+
+
+_local = threading.local()
+
+
+def _shared_session():
+    """This thread's session, created on its first request"""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = _PersistentSession()
+    return session
+
+
+def install_keep_alive():
+    """Make gTTS send every request through the shared pool. Safe to call more than once."""
+    if getattr(gtts.tts.requests, "Session", None) is _shared_session:
+        return
+    # gtts.tts only sees this namespace; the real requests module is untouched
+    gtts.tts.requests = types.SimpleNamespace(**{**vars(requests), "Session": _shared_session})
@@ -0,0 +1,56 @@
+"""
+One HTTPS connection pool to lichess.org for the whole app.
+
+Games, seeks, event streams and puzzle fetches all go through SESSION, so
+they share keep-alive connections instead of each handshaking anew.
+
+Those requests come from several threads (event pump, game stream, move
+thread, seek thread, puzzle prefetch) and requests.Session is not
+thread-safe, so SESSION hands each thread its own session. They all mount
+one HTTPAdapter, whose urllib3 pool is, so the connections are still shared.
+"""
+import os
+import threading
+
+import berserk
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import _env  # Loads .env once for the whole package
+
+# Enough for the incoming-event stream, a game stream and API calls at once
+POOL_SIZE = 8
+
+ADAPTER = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+
+
+def _make_session():
+    token = os.getenv('LICHESS_API_TOKEN')
+    session = berserk.TokenSession(token)
+    # TokenSession replaces requests' default headers outright; keep them
+    # (gzip, keep-alive) and only add the token
+    session.headers = requests.utils.default_headers()
+    if token:
+        session.headers["Authorization"] = f"Bearer {token}"
+    session.mount("https://", ADAPTER)
+    return session
+
+
+class _ThreadSessions:
+    """Stands in for one requests session; each thread gets its own behind it."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = _make_session()
+        return session
+
+    def __getattr__(self, name):
+        # get/post/request/headers/... of the calling thread's session
+        return getattr(self._session(), name)
+
+
+SESSION = _ThreadSessions()
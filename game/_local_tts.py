@@ -0,0 +1,42 @@
+"""
+Optional offline speech through pyttsx3.
+
+Set LOCAL_TTS=1 to speak without a Google TTS round-trip. pyttsx3 is not a
+hard requirement, so Google TTS is used whenever it is missing or fails.
+"""
+import logging
+import os
+
+from . import _env  # Loads .env once for the whole package
+try:
+    import pyttsx3  # Optional offline speech engine
+except ImportError:
+    pyttsx3 = None
+
+logger = logging.getLogger(__name__)
+
+
+def local_tts_requested():
+    """True when LOCAL_TTS asks for offline speech and pyttsx3 is installed"""
+    if os.getenv('LOCAL_TTS', '').lower() not in ('1', 'true', 'yes'):
+        return False
+    if pyttsx3 is None:
+        logger.warning("LOCAL_TTS is set but pyttsx3 is not installed - using Google TTS")
+        return False
+    return True
+
+
+def local_engine():
+    """
+    A pyttsx3 engine if offline speech was requested, otherwise None.
+
+    pyttsx3 engines are not thread-safe: create the engine in the thread
+    that will call say() and runAndWait().
+    """
+    if not local_tts_requested():
+        return None
+    try:
+        return pyttsx3.init()
+    except Exception as e:
+        logger.warning("Could not start pyttsx3 (%s) - using Google TTS", e)
+        return None
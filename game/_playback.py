@@ -0,0 +1,20 @@
+"""
+Blocking playback of pygame Sounds without a polling loop.
+"""
+import pygame
+
+# Poll interval for the last few milliseconds the mixer may still be draining
+TAIL_POLL_MS = 5
+
+
+def play_and_wait(sound):
+    """Play a pygame Sound and return once it has finished."""
+    channel = sound.play()
+    if channel is None:
+        # No free channel - nothing is playing
+        return
+    # The length is known up front, so sleep through it in one call instead of
+    # waking up every few milliseconds to ask whether it is done yet
+    pygame.time.wait(int(sound.get_length() * 1000))
+    while channel.get_busy():
+        pygame.time.wait(TAIL_POLL_MS)
@@ -0,0 +1,38 @@
+"""
+Turn SAN moves into the words that are spoken for them.
+"""
+
+FILES = "abcdefgh"
+RANKS = "12345678"
+
+# N is knight, but we say night - gTTS SUCKS LOL
+PIECE_WORDS = {"N": "night", "B": "Bishop", "R": "Rook", "Q": "Queen", "K": "King"}
+SYMBOL_WORDS = {"x": "takes", "=": "promotes to", "+": "check", "#": "checkmate"}
+
+
+def san_to_words(san):
+    """
+    Split a SAN move into the words to speak, in one left-to-right pass.
+
+    "Bxe5+" -> ["Bishop", "takes", "e5", "check"], "O-O" -> ["Castle kingside"]
+    """
+    if san.startswith("O-O-O"):
+        words, i = ["Castle queenside"], 5
+    elif san.startswith("O-O"):
+        words, i = ["Castle kingside"], 3
+    else:
+        words, i = [], 0
+    while i < len(san):
+        char = san[i]
+        if char in FILES and i + 1 < len(san) and san[i + 1] in RANKS:
+            words.append(san[i:i + 2])  # A square is spoken as one word
+            i += 2
+            continue
+        if char in PIECE_WORDS:
+            words.append(PIECE_WORDS[char])
+        elif char in SYMBOL_WORDS:
+            words.append(SYMBOL_WORDS[char])
+        elif char in FILES or char in RANKS:
+            words.append(char)  # Pawn file or disambiguation
+        i += 1
+    return words
@@ -0,0 +1,51 @@
+"""
+Prefix tree over spoken vocabulary for lookups that tolerate a misheard letter.
+"""
+
+_END = ""  # Key marking a complete word; real keys are single characters
+
+
+class WordTrie:
+    """Maps words to payloads and finds the closest stored word within a few edits."""
+
+    def __init__(self, words):
+        """Build the trie from a {word: payload} mapping."""
+        self.root = {}
+        for word, payload in words.items():
+            node = self.root
+            for char in word:
+                node = node.setdefault(char, {})
+            node[_END] = (word, payload)
+
+    def lookup(self, word, max_edits=1):
+        """
+        Return the payload of the closest stored word within max_edits
+        (Levenshtein), or None when nothing is close enough or the best
+        matches disagree.
+        """
+        best = []
+        best_distance = max_edits + 1
+        first_row = list(range(len(word) + 1))
+
+        # Walk the trie once, carrying one edit-distance row per node and
+        # pruning branches whose row can no longer get under max_edits
+        stack = [(child, char, first_row) for char, child in self.root.items() if char != _END]
+        while stack:
+            node, char, previous = stack.pop()
+            row = [previous[0] + 1]
+            for i, word_char in enumerate(word, 1):
+                row.append(min(row[i - 1] + 1, previous[i] + 1, previous[i - 1] + (word_char != char)))
+
+            distance = row[-1]
+            if _END in node and distance <= max_edits:
+                if distance < best_distance:
+                    best, best_distance = [], distance
+                if distance == best_distance:
+                    best.append(node[_END][1])
+
+            if min(row) <= max_edits:
+                stack.extend((child, next_char, row) for next_char, child in node.items() if next_char != _END)
+
+        if not best or any(payload != best[0] for payload in best):
+            return None
+        return best[0]
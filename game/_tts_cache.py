@@ -0,0 +1,68 @@
+"""
+Disk cache of Google TTS audio, keyed by a hash of the spoken text.
+
+Prompts such as "Please try again" are identical every session, so after the
+first run they replay from a local MP3 instead of a network round-trip.
+"""
+import hashlib
+import io
+import logging
+import os
+import tempfile
+
+from gtts import gTTS
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "chess_voice_tts")
+
+# Least recently used prompts are evicted beyond this many files
+MAX_ENTRIES = 200
+
+
+def _cache_path(text, lang, slow):
+    key = hashlib.sha1(f"{lang}|{slow}|{text}".encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.mp3")
+
+
+def _evict():
+    """Delete the least recently used files once the cache is over MAX_ENTRIES"""
+    with os.scandir(CACHE_DIR) as entries:
+        files = [entry for entry in entries if entry.name.endswith(".mp3") and entry.is_file()]
+    if len(files) <= MAX_ENTRIES:
+        return
+    files.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in files[:len(files) - MAX_ENTRIES]:
+        try:
+            os.unlink(entry.path)
+        except OSError as e:
+            logger.warning("Could not evict cached speech %s: %s", entry.path, e)
+
+
+def synthesize(text, lang='en', slow=False):
+    """MP3 bytes for text, from the disk cache when this text was spoken before."""
+    path = _cache_path(text, lang, slow)
+    try:
+        with open(path, "rb") as f:
+            audio = f.read()
+        # Reading counts as a use for LRU eviction
+        os.utime(path)
+        return audio
+    except OSError:
+        pass
+
+    buffer = io.BytesIO()
+    gTTS(text=text, lang=lang, slow=slow).write_to_fp(buffer)
+    audio = buffer.getvalue()
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Write under a temporary name so a concurrent reader never sees half a file
+        fd, temp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(audio)
+        os.replace(temp_path, path)
+        _evict()
+    except OSError as e:
+        logger.warning("Could not cache speech for '%s': %s", text, e)
+    return audio
@@ -0,0 +1,104 @@
+"""
+Spoken-word vocabulary shared by the chess notation parsers.
+"""
+import re
+import string
+
+# Dictionary mapping spoken file names to chess notation
+FILES = {
+    'a': 'a', 'alpha': 'a', 'ay': 'a', 'hey': 'a',
+    'b': 'b', 'bravo': 'b', 'bee': 'b', 'be': 'b',
+    'c': 'c', 'charlie': 'c', 'see': 'c', 'sea': 'c',
+    'd': 'd', 'delta': 'd', 'dee': 'd',
+    'e': 'e', 'echo': 'e', 'ee': 'e',
+    'f': 'f', 'foxtrot': 'f', 'ef': 'f',
+    'g': 'g', 'golf': 'g', 'gee': 'g',
+    'h': 'h', 'hotel': 'h', 'aitch': 'h'
+}
+
+# Dictionary for ranks (numbers) - expanded for Deepgram word output
+RANKS = {
+    'one': '1', '1': '1', 'won': '1',
+    'two': '2', '2': '2', 'to': '2', 'too': '2',
+    'three': '3', '3': '3', 'tree': '3',
+    'four': '4', '4': '4', 'for': '4',
+    'five': '5', '5': '5',
+    'six': '6', '6': '6',
+    'seven': '7', '7': '7',
+    'eight': '8', '8': '8', 'ate': '8'
+}
+
+# One typed lookup for square words: word -> ("file", letter) or ("rank", digit)
+SQUARE_WORDS = {word: ("rank", rank) for word, rank in RANKS.items()}
+SQUARE_WORDS.update((word, ("file", letter)) for word, letter in FILES.items())
+
+# Piece name mappings
+PIECES = {
+    'king': 'K',
+    'queen': 'Q',
+    'rook': 'R',
+    'bishop': 'B',
+    'knight': 'N',
+    'night': 'N',
+    'pawn': '',  # Pawns don't have a letter in SAN,
+    'pon': ''
+}
+
+# Pieces a pawn may promote to
+PROMOTION_MAP = {"queen": "Q", "rook": "R", "bishop": "B", "knight": "N", "night": "N"}
+
+# Castling king moves in UCI, as they are read back to the player
+CASTLE_DESCRIPTIONS = {
+    "e1g1": "Castle kingside (white)",
+    "e1c1": "Castle queenside (white)",
+    "e8g8": "Castle kingside (black)",
+    "e8c8": "Castle queenside (black)",
+}
+
+# Everyday words that sound or are spelled close to a chess or number word
+# ("want" ~ knight, "look" ~ rook, "tell" ~ hotel, "give" ~ five). Never
+# guessed into the vocabulary.
+COMMON_WORDS = frozenset([
+    "again", "along", "been", "book", "came", "come", "comes", "coming", "deal",
+    "even", "fine", "fire", "firm", "form", "frame", "front", "gain", "give",
+    "going", "gold", "gone", "gonna", "half", "height", "hour", "into", "keen",
+    "kind", "leave", "light", "line", "live", "look", "made", "might", "mind",
+    "mine", "need", "neat", "nice", "none", "note", "open", "pour", "right",
+    "ring", "same", "seen", "since", "sing", "some", "song", "soon", "still",
+    "take", "taken", "tall", "tell", "till", "told", "took", "unit", "upon",
+    "want", "weight", "went", "wine", "wolf", "work", "your", "yours",
+])
+
+# Keyword sets, built once at import time
+CASTLE_WORDS = frozenset(["castle", "castles", "castling"])
+QUEENSIDE_WORDS = frozenset(["queen", "queenside", "long", "queens"])
+CAPTURE_WORDS = frozenset(["takes", "captures", "x"])
+PROMOTE_WORDS = frozenset(["promote", "promotes"])
+
+# Combined square token such as "e4", matched in C instead of per-character lookups
+SQUARE_RE = re.compile(r'([a-h])([1-8])')
+
+# Keeps ASCII letters, digits and whitespace and deletes every other ASCII
+# character from a whole transcript in one C-level pass
+_KEEP = frozenset(string.ascii_letters + string.digits + string.whitespace)
+PUNCT_TABLE = str.maketrans('', '', ''.join(chr(c) for c in range(128) if chr(c) not in _KEEP))
+
+# Non-move commands, in priority order when several are spoken together
+SPECIAL_COMMANDS = {
+    "exit": "EXIT",
+    "quit": "EXIT",
+    "resign": "resign",
+    "accept draw": "accept draw",
+    "decline draw": "decline draw",
+    "draw": "draw",
+}
+SPECIAL_RE = re.compile(r'\b(exit|quit|resign|accept draw|decline draw|draw)\b')
+_SPECIAL_PRIORITY = {phrase: rank for rank, phrase in enumerate(SPECIAL_COMMANDS)}
+
+
+def match_special_command(text_lower):
+    """Return the command for exit/resign/draw phrases in lowercased text, or None."""
+    found = SPECIAL_RE.findall(text_lower)
+    if not found:
+        return None
+    return SPECIAL_COMMANDS[min(found, key=_SPECIAL_PRIORITY.__getitem__)]
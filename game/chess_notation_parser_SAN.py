@@ -2,294 +2,524 @@
 Module for parsing chess SAN notation from spoken text.
 Converts voice input to SAN format, then uses python-chess to convert to UCI.
 """
+import logging
 import re
+from functools import lru_cache
+
 import chess
+from ._trie import WordTrie
+from ._vocab import (
+    FILES, RANKS, PIECES, PROMOTION_MAP, CASTLE_WORDS, QUEENSIDE_WORDS,
+    CAPTURE_WORDS, PROMOTE_WORDS, COMMON_WORDS, SQUARE_RE, PUNCT_TABLE, match_special_command,
+)
 
-def parse_voice_to_san(text):
-    """Convert spoken chess moves to SAN format."""
-    text = text.lower().strip()
-    print(f"DEBUG SAN: Parsing voice text: '{text}'")
-    
-    # Clean punctuation from text
-    words = text.split()
-    cleaned_words = []
+logger = logging.getLogger(__name__)
+
+def _build_token_table():
+    """Map every known spoken word to a single (kind, value) token."""
+    table = {}
+    # Later entries win, mirroring the order the parser used to test words in
+    for word, rank in RANKS.items():
+        table[word] = ("rank", rank)
+    for word, file_letter in FILES.items():
+        table[word] = ("file", file_letter)
+    for word in CASTLE_WORDS:
+        table[word] = ("castle", None)
+    table["from"] = ("from", None)
+    for word in PROMOTE_WORDS:
+        table[word] = ("promote", None)
+    # "to" is usually filler but doubles as rank two after a file
+    table["to"] = ("to", RANKS["to"])
+    for word in CAPTURE_WORDS:
+        table[word] = ("capture", None)
+    for word, piece in PIECES.items():
+        table[word] = ("piece", piece)
+    return table
+
+TOKENS = _build_token_table()
+
+# Soundex consonant classes; vowels and h/w/y carry no code
+_PHONETIC_CODES = {
+    letter: code
+    for letters, code in (("bfpv", "1"), ("cgjkqsxz", "2"), ("dt", "3"), ("l", "4"), ("mn", "5"), ("r", "6"))
+    for letter in letters
+}
+
+def phonetic_key(word):
+    """Sound-alike key for a spoken word, e.g. 'knight', 'night' and 'nite' all give '53'."""
+    for prefix, sound in (("kn", "n"), ("wr", "r"), ("gn", "n")):
+        if word.startswith(prefix):
+            word = sound + word[2:]
+    word = word.replace("gh", "").replace("ph", "f")
+    key = []
+    for char in word:
+        code = _PHONETIC_CODES.get(char)
+        if code and (not key or key[-1] != code):
+            key.append(code)
+    return "".join(key)
+
+def _build_phonetic_table():
+    """Map phonetic keys of the vocabulary back to a canonical spoken word."""
+    table = {}
+    ambiguous = set()
+    for word, token in TOKENS.items():
+        key = phonetic_key(word)
+        # Rank words sound like too many everyday words ("draw" -> "three")
+        if token[0] == "rank" or len(word) < 3 or len(key) < 2:
+            continue
+        if key in table and TOKENS[table[key]] != token:
+            ambiguous.add(key)
+        table.setdefault(key, word)
+    # A key shared by words with different meanings can't be resolved safely
+    for key in ambiguous:
+        del table[key]
+    return table
+
+PHONETIC = _build_phonetic_table()
+KNOWN_WORDS = frozenset(TOKENS) | QUEENSIDE_WORDS
+
+# Spelling-level fallback for words one letter off ("bisop", "captuers" is two - no match).
+# Rank words stay out for the same reason as in the phonetic table.
+SPELLING = WordTrie({
+    word: word for word in KNOWN_WORDS
+    if len(word) >= 4 and TOKENS.get(word, ("",))[0] != "rank"
+})
+
+def normalize_word(word, guess_pieces=True):
+    """
+    Map an unrecognized word like 'nite' or 'bisop' to the vocabulary word it sounds or is spelled like.
     
+    Without guess_pieces, a word that sounds or is spelled like a piece is left alone.
+    """
+    if word in KNOWN_WORDS or word in COMMON_WORDS or len(word) < 4 or SQUARE_RE.fullmatch(word):
+        return word
+    guess = PHONETIC.get(phonetic_key(word)) or SPELLING.lookup(word)
+    if guess is None or (not guess_pieces and _kind(guess) == "piece"):
+        return word
+    return guess
+
+def _kind(word):
+    """Token kind of a vocabulary word or square, or None for anything else."""
+    token = TOKENS.get(word)
+    if token is not None:
+        return token[0]
+    return "square" if SQUARE_RE.fullmatch(word) else None
+
+# What has to come next (after any "to") for a guessed word to be part of the move
+_SLOT_FOLLOWERS = {
+    "piece": frozenset(["square", "file", "capture", "from"]),
+    "capture": frozenset(["square", "file", "piece"]),
+    "from": frozenset(["file", "rank"]),
+    "promote": frozenset(["piece"]),
+}
+
+def normalize_words(words, guess_pieces=True):
+    """
+    Replace unrecognized words by the vocabulary word they sound or are
+    spelled like, but only in a slot where that word fits the move.
+
+    A guessed piece has to come before its square (or a capture) and is
+    dropped when a piece was spoken exactly; a guessed file has to be
+    followed by a rank; a guessed castle only counts when no square was
+    named. Anything else stays as spoken, so filler like "want" or "going"
+    remains filler. Without guess_pieces no piece is guessed at all.
+    """
+    if all(word in KNOWN_WORDS or SQUARE_RE.fullmatch(word) for word in words):
+        return list(words)
+    spoken_piece = any(word in PIECES for word in words)
+    names_square = any(SQUARE_RE.fullmatch(word) for word in words)
+
+    cleaned = list(words)
+    # Right to left, so each guess sees the already-cleaned words after it
+    next_kind = beyond_to = None
+    for i in range(len(cleaned) - 1, -1, -1):
+        word = cleaned[i]
+        guess = normalize_word(word, guess_pieces)
+        if guess != word:
+            kind = _kind(guess)
+            if kind == "piece":
+                fits = not spoken_piece and beyond_to in _SLOT_FOLLOWERS["piece"]
+            elif kind == "file":
+                fits = next_kind == "rank"
+            elif kind == "castle":
+                fits = not names_square
+            elif kind is None:
+                # "queenside" and friends only mean something next to a castle
+                fits = not CASTLE_WORDS.isdisjoint(cleaned)
+            else:
+                fits = beyond_to in _SLOT_FOLLOWERS.get(kind, ())
+            if fits:
+                cleaned[i] = guess
+                logger.debug("Heard '%s' as '%s'", word, guess)
+        kind = _kind(cleaned[i])
+        if kind != "to":
+            beyond_to = kind
+        next_kind = kind
+    return cleaned
+
+NO_TOKEN = (None, None)
+
+def tokenize(words):
+    """Classify cleaned words into (kind, value) tokens in a single pass."""
+    tokens = []
     for word in words:
-        # Remove punctuation from each word
-        cleaned_word = re.sub(r'[^\w]', '', word)
-        if cleaned_word:  # Only add non-empty words
-            cleaned_words.append(cleaned_word)
-    
-    print(f"DEBUG SAN: Cleaned words: {cleaned_words}")
-    
-    # Dictionary mapping spoken file names to chess notation
-    files = {
-        'a': 'a', 'alpha': 'a', 'ay': 'a', 'hey': 'a',
-        'b': 'b', 'bravo': 'b', 'bee': 'b', 'be': 'b',
-        'c': 'c', 'charlie': 'c', 'see': 'c', 'sea': 'c',
-        'd': 'd', 'delta': 'd', 'dee': 'd',
-        'e': 'e', 'echo': 'e', 'ee': 'e',
-        'f': 'f', 'foxtrot': 'f', 'ef': 'f',
-        'g': 'g', 'golf': 'g', 'gee': 'g',
-        'h': 'h', 'hotel': 'h', 'aitch': 'h'
-    }
-    
-    # Dictionary for ranks (numbers)
-    ranks = {
-        'one': '1', '1': '1', 'won': '1',
-        'two': '2', '2': '2', 'to': '2', 'too': '2',
-        'three': '3', '3': '3', 'tree': '3',
-        'four': '4', '4': '4', 'for': '4',
-        'five': '5', '5': '5',
-        'six': '6', '6': '6',
-        'seven': '7', '7': '7',
-        'eight': '8', '8': '8', 'ate': '8'
-    }
+        token = TOKENS.get(word)
+        if token is None:
+            token = ("square", word) if SQUARE_RE.fullmatch(word) else NO_TOKEN
+        tokens.append(token)
+    return tokens
+
+# States of the move grammar: between words, or waiting for the word that
+# completes a file ("e" -> "four"), a "from" disambiguation or a promotion
+START, SAW_FILE, SAW_FROM, SAW_PROMOTE = "start", "file", "from", "promote"
+PROMOTION_PIECES = frozenset(PROMOTION_MAP.values())
+
+def _skip(move, value):
+    return True
+
+def _set_piece(move, value):
+    # Only the first piece named is the one moving; later ones are ignored
+    if move["piece"] is None:
+        move["piece"] = value
+        logger.debug("Found piece: %s", value)
+    return True
+
+def _set_capture(move, value):
+    move["capture"] = True
+    logger.debug("Found capture indicator")
+    return True
+
+def _hold_file(move, value):
+    move["held_file"] = value
+    return True
+
+def _set_target(move, value):
+    move["target"] = value
+    logger.debug("Found combined target square: %s", value)
+    return True
+
+def _set_target_from_held_file(move, value):
+    move["target"] = move["held_file"] + value
+    logger.debug("Found target square: %s", move["target"])
+    return True
+
+def _set_from_file(move, value):
+    move["from_file"] = value
+    logger.debug("Found from file: %s", value)
+    return True
+
+def _set_from_rank(move, value):
+    move["from_rank"] = value
+    logger.debug("Found from rank: %s", value)
+    return True
+
+def _set_promotion(move, value):
+    # "promote king" is no promotion - let the main state see the piece instead
+    if value not in PROMOTION_PIECES:
+        return False
+    move["promotion"] = value
+    logger.debug("Found promotion: %s", value)
+    return True
+
+# (state, token kind) -> (next state, action). An action returning False, or a
+# missing entry, hands the token back to START (SAW_FROM just drops it).
+_TRANSITIONS = {
+    (START, "piece"): (START, _set_piece),
+    (START, "capture"): (START, _set_capture),
+    (START, "promote"): (SAW_PROMOTE, _skip),
+    (START, "from"): (SAW_FROM, _skip),
+    (START, "file"): (SAW_FILE, _hold_file),
+    (START, "square"): (START, _set_target),
+    # "to" carries rank two as its value, so "e to" is e2
+    (SAW_FILE, "rank"): (START, _set_target_from_held_file),
+    (SAW_FILE, "to"): (START, _set_target_from_held_file),
+    (SAW_FROM, "file"): (START, _set_from_file),
+    (SAW_FROM, "rank"): (START, _set_from_rank),
+    (SAW_FROM, "to"): (START, _set_from_rank),
+    (SAW_PROMOTE, "to"): (SAW_PROMOTE, _skip),
+    (SAW_PROMOTE, "piece"): (START, _set_promotion),
+}
+
+def parse_voice_to_san(text, guess_pieces=True):
+    """Convert spoken chess moves to SAN format (guess_pieces: read misheard words as pieces)."""
+    text = text.lower().strip()
+    logger.debug("Parsing voice text: '%s'", text)
+    return _voice_to_san_cached(text, guess_pieces)
+
+@lru_cache(maxsize=256)
+def _voice_to_san_cached(text, guess_pieces=True):
+    """Parse already lowercased and stripped text; repeated utterances hit the cache."""
+    # Clean punctuation from text
+    raw_words = text.translate(PUNCT_TABLE).split()
+
+    # Fast paths for the most common utterances: "e4" and "knight f3"
+    if len(raw_words) == 1 and SQUARE_RE.fullmatch(raw_words[0]):
+        return raw_words[0]
+    if len(raw_words) == 2 and raw_words[0] in PIECES and SQUARE_RE.fullmatch(raw_words[1]):
+        return PIECES[raw_words[0]] + raw_words[1]
+
+    cleaned_words = normalize_words(raw_words, guess_pieces)
+
+    logger.debug("Cleaned words: %s", cleaned_words)
     
-    # Piece name mappings
-    pieces = {
-        'king': 'K',
-        'queen': 'Q',
-        'rook': 'R',
-        'bishop': 'B',
-        'knight': 'N',
-        'night': 'N',
-        'pawn': '',  # Pawns don't have a letter in SAN,
-        'pon': ''
-    }
+    words_set = set(cleaned_words)
+    tokens = tokenize(cleaned_words)
+    # next_words[i] is the word after position i ("" past the end), so lookaheads are one .get()
+    next_words = cleaned_words[1:] + [""]
     
     # Handle castling first
-    if any(word in cleaned_words for word in ["castle", "castles", "castling"]):
-        is_queenside = any(word in cleaned_words for word in ["queen", "queenside", "long", "queens"])
+    if not CASTLE_WORDS.isdisjoint(words_set):
+        is_queenside = not QUEENSIDE_WORDS.isdisjoint(words_set)
         san_move = "O-O-O" if is_queenside else "O-O"
-        print(f"DEBUG SAN: Parsed as castling: '{san_move}'")
+        logger.debug("Parsed as castling: '%s'", san_move)
         return san_move
     
     # Special handling for pawn captures with patterns like:
     # "pawn from h takes g5" or "h pawn takes g5"
-    if "pawn" in cleaned_words and any(capture_word in cleaned_words for capture_word in ["takes", "captures", "x"]):
-        print("DEBUG SAN: Detected pawn capture pattern")
+    if "pawn" in words_set and not CAPTURE_WORDS.isdisjoint(words_set):
+        logger.debug("Detected pawn capture pattern")
         
-        # Look for source file patterns
-        pawn_index = cleaned_words.index("pawn")
-        capture_index = -1
+        # Record every position the patterns below need in a single pass
+        pawn_index = capture_index = from_index = promote_index = first_file_index = -1
+        target_square = None
         for i, word in enumerate(cleaned_words):
-            if word in ["takes", "captures", "x"]:
+            kind = tokens[i][0]
+            if word == "pawn" and pawn_index < 0:
+                pawn_index = i
+            elif kind == "capture" and capture_index < 0:
                 capture_index = i
-                break
+                continue
+            elif kind == "from" and from_index < 0:
+                from_index = i
+            elif kind == "promote" and promote_index < 0:
+                promote_index = i
+            elif kind == "file" and first_file_index < 0:
+                first_file_index = i
+            
+            # Find target square after capture word
+            if capture_index >= 0 and target_square is None:
+                # Look for file + rank combination
+                rank_number = RANKS.get(next_words[i]) if kind == "file" else None
+                if rank_number:
+                    target_square = tokens[i][1] + rank_number
+                    logger.debug("Found pawn target square: %s", target_square)
+                # Check for combined square like "g5"
+                elif kind == "square":
+                    target_square = tokens[i][1]
+                    logger.debug("Found pawn combined target square: %s", target_square)
         
         source_file = None
         
         # Pattern 1: "pawn from h takes g5"
-        if "from" in cleaned_words:
-            from_index = cleaned_words.index("from")
-            if from_index + 1 < len(cleaned_words) and cleaned_words[from_index + 1] in files:
-                source_file = files[cleaned_words[from_index + 1]]
-                print(f"DEBUG SAN: Found pawn source file from 'from' pattern: {source_file}")
+        if from_index >= 0:
+            source_file = FILES.get(next_words[from_index])
+            if source_file:
+                logger.debug("Found pawn source file from 'from' pattern: %s", source_file)
         
         # Pattern 2: "h pawn takes g5" - file letter before "pawn"
-        elif pawn_index > 0 and cleaned_words[pawn_index - 1] in files:
-            source_file = files[cleaned_words[pawn_index - 1]]
-            print(f"DEBUG SAN: Found pawn source file before 'pawn': {source_file}")
+        elif pawn_index > 0 and tokens[pawn_index - 1][0] == "file":
+            source_file = tokens[pawn_index - 1][1]
+            logger.debug("Found pawn source file before 'pawn': %s", source_file)
         
         # Pattern 3: Look for a file letter anywhere before the capture word
-        if not source_file and capture_index > 0:
-            for i in range(capture_index):
-                if cleaned_words[i] in files:
-                    source_file = files[cleaned_words[i]]
-                    print(f"DEBUG SAN: Found pawn source file before capture: {source_file}")
-                    break
-        
-        # Find target square after capture word
-        target_square = None
-        if capture_index >= 0:
-            for i in range(capture_index + 1, len(cleaned_words)):
-                word = cleaned_words[i]
-                # Look for file + rank combination
-                if word in files and i + 1 < len(cleaned_words) and cleaned_words[i + 1] in ranks:
-                    target_square = files[word] + ranks[cleaned_words[i + 1]]
-                    print(f"DEBUG SAN: Found pawn target square: {target_square}")
-                    break
-                # Check for combined square like "g5"
-                elif len(word) == 2 and word[0] in files and word[1] in ranks:
-                    target_square = files[word[0]] + ranks[word[1]]
-                    print(f"DEBUG SAN: Found pawn combined target square: {target_square}")
-                    break
+        if not source_file and 0 <= first_file_index < capture_index:
+            source_file = tokens[first_file_index][1]
+            logger.debug("Found pawn source file before capture: %s", source_file)
         
         # Check for promotion in pawn capture
         promotion = None
-        if "promote" in cleaned_words or "promotes" in cleaned_words:
-            promote_index = -1
-            for i, word in enumerate(cleaned_words):
-                if word in ["promote", "promotes"]:
-                    promote_index = i
-                    break
+        if promote_index >= 0:
+            # Look for the promotion piece after "promote", skipping "to" if present
+            j = promote_index + 1
+            while j < len(tokens) and tokens[j][0] == "to":
+                j += 1
             
-            if promote_index >= 0:
-                # Look for the promotion piece after "promote", skipping "to" if present
-                j = promote_index + 1
-                while j < len(cleaned_words) and cleaned_words[j] == "to":
-                    j += 1
-                
-                if j < len(cleaned_words) and cleaned_words[j] in ["queen", "rook", "bishop", "knight", "night"]:
-                    promotion_map = {"queen": "Q", "rook": "R", "bishop": "B", "knight": "N", "night": "N"}
-                    promotion = promotion_map[cleaned_words[j]]
-                    print(f"DEBUG SAN: Found pawn capture promotion: {promotion}")
+            promotion = PROMOTION_MAP.get(next_words[j - 1])
+            if promotion:
+                logger.debug("Found pawn capture promotion: %s", promotion)
         
         # Build pawn capture SAN
         if source_file and target_square:
             san_move = source_file + "x" + target_square
             if promotion:
                 san_move += "=" + promotion
-            print(f"DEBUG SAN: Built pawn capture SAN: '{san_move}'")
+            logger.debug("Built pawn capture SAN: '%s'", san_move)
             return san_move
         else:
-            print(f"DEBUG SAN: Incomplete pawn capture - source_file: {source_file}, target_square: {target_square}")
+            logger.debug("Incomplete pawn capture - source_file: %s, target_square: %s", source_file, target_square)
     
     # Look for piece type (non-pawn pieces or non-capture pawn moves)
-    piece_type = None
-    capture = False
-    target_square = None
-    from_file = None
-    from_rank = None
-    promotion = None
+    move = {
+        "piece": None, "capture": False, "target": None,
+        "from_file": None, "from_rank": None, "promotion": None, "held_file": None,
+    }
     
-    i = 0
-    while i < len(cleaned_words):
-        word = cleaned_words[i]
-        
-        # Check for piece names (but only if we haven't found a promotion piece)
-        if word in pieces and piece_type is None:
-            piece_type = pieces[word]
-            print(f"DEBUG SAN: Found piece: {word} -> {piece_type}")
-            i += 1
-            continue
-        
-        # Check for capture indicators
-        if word in ["takes", "captures", "x"]:
-            capture = True
-            print(f"DEBUG SAN: Found capture indicator")
-            i += 1
-            continue
-        
-        # Check for "to" (indicates destination)
-        if word == "to":
-            i += 1
-            continue
-        
-        # Check for promotion
-        if word == "promote" or word == "promotes":
-            # Look for the promotion piece, skipping "to" if present
-            j = i + 1
-            while j < len(cleaned_words) and cleaned_words[j] == "to":
-                j += 1
-            
-            if j < len(cleaned_words) and cleaned_words[j] in ["queen", "rook", "bishop", "knight", "night"]:
-                promotion_map = {"queen": "Q", "rook": "R", "bishop": "B", "knight": "N", "night": "N"}
-                promotion = promotion_map[cleaned_words[j]]
-                print(f"DEBUG SAN: Found promotion: {promotion}")
-                i = j + 1  # Skip to after the promotion piece
-                continue
-            else:
-                i += 1
-                continue
-        
-        # Check for disambiguation (from file/rank)
-        if word == "from":
-            if i + 1 < len(cleaned_words):
-                next_word = cleaned_words[i + 1]
-                if next_word in files:
-                    from_file = files[next_word]
-                    print(f"DEBUG SAN: Found from file: {from_file}")
-                elif next_word in ranks:
-                    from_rank = ranks[next_word]
-                    print(f"DEBUG SAN: Found from rank: {from_rank}")
-                i += 2
+    state = START
+    for kind, value in tokens:
+        step = _TRANSITIONS.get((state, kind))
+        if step is None or not step[1](move, value):
+            if state == SAW_FROM:
+                # The word after "from" is consumed even when it isn't a file or rank
+                state = START
                 continue
-            i += 1
-            continue
-        
-        # Check for target square
-        # Look for file + rank combination
-        if word in files:
-            file_letter = files[word]
-            # Look for rank in next word
-            if i + 1 < len(cleaned_words) and cleaned_words[i + 1] in ranks:
-                rank_number = ranks[cleaned_words[i + 1]]
-                target_square = file_letter + rank_number
-                print(f"DEBUG SAN: Found target square: {target_square}")
-                i += 2
+            # An unfinished file or promotion hands the token back to the main state
+            state = START
+            step = _TRANSITIONS.get((START, kind))
+            if step is None:
                 continue
-        
-        # Check for combined square like "c5"
-        if len(word) == 2 and word[0] in files and word[1] in ranks:
-            file_letter = files[word[0]]
-            rank_number = ranks[word[1]]
-            target_square = file_letter + rank_number
-            print(f"DEBUG SAN: Found combined target square: {target_square}")
-            i += 1
-            continue
-        
-        i += 1
+            step[1](move, value)
+        state = step[0]
+    
+    piece_type = move["piece"]
+    capture = move["capture"]
+    target_square = move["target"]
+    from_file = move["from_file"]
+    from_rank = move["from_rank"]
+    promotion = move["promotion"]
     
     # Build SAN notation
     if not target_square:
-        print("DEBUG SAN: No target square found")
+        logger.debug("No target square found")
         return None
     
-    san_move = ""
-    
-    # Add piece (empty for pawns)
-    if piece_type is not None:
-        san_move += piece_type
-    
     # Special handling for pawn captures: if it's a pawn capture but no from_file specified,
     # this is an error condition for captures
     if piece_type == '' and capture and not from_file:
-        print("DEBUG SAN: ERROR - Pawn capture requires source file specification")
+        logger.debug("Pawn capture requires source file specification")
         return None
     
+    parts = []
+    
+    # Add piece (empty for pawns)
+    if piece_type:
+        parts.append(piece_type)
+    
     # Add disambiguation
     if from_file:
-        san_move += from_file
+        parts.append(from_file)
     if from_rank:
-        san_move += from_rank
+        parts.append(from_rank)
     
     # Add capture indicator
     if capture:
-        san_move += "x"
+        parts.append("x")
     
     # Add target square
-    san_move += target_square
+    parts.append(target_square)
     
     # Add promotion
     if promotion:
-        san_move += "=" + promotion
+        parts.append("=" + promotion)
     
-    print(f"DEBUG SAN: Built SAN move: '{san_move}'")
+    san_move = "".join(parts)
+    logger.debug("Built SAN move: '%s'", san_move)
     return san_move
 
-def convert_san_to_uci(san_move, board_state):
-    """Convert SAN notation to UCI using python-chess."""
+class TurnCache:
+    """Legal-move SAN index for the current position, kept across STT retries within a turn."""
+    
+    def __init__(self):
+        # (fen, {san: uci}) swapped as one object so readers never see a mismatched pair
+        self.entry = (None, {})
+    
+    def index(self, board_state):
+        """Map the SAN of every legal move (without check marks) to its UCI, rebuilt only when the position changes."""
+        fen = board_state.fen()
+        cached_fen, san_to_uci = self.entry
+        if cached_fen != fen:
+            san_to_uci = {board_state.san(move).rstrip("+#"): move.uci() for move in board_state.legal_moves}
+            self.entry = (fen, san_to_uci)
+        return san_to_uci
+
+_turn_cache = TurnCache()
+
+def legal_san_index(board_state):
+    """SAN -> UCI index for every legal move in board_state."""
+    return _turn_cache.index(board_state)
+
+def edit_distance(a, b):
+    """Levenshtein distance between two short strings."""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        previous = current
+    return previous[-1]
+
+# Piece, disambiguation, capture, destination square and promotion of a SAN move
+SAN_PARTS_RE = re.compile(r'([KQRBN]?)([a-h]?)([1-8]?)(x?)([a-h][1-8])(=[QRBN])?')
+
+def closest_legal_move(san_move, board_state, max_distance=1):
+    """Return the UCI of the single legal move whose SAN is within max_distance edits, or None.
+    
+    Only the disambiguation or capture mark may differ: the piece,
+    destination square and promotion must be the ones spoken, so "Qd4" is
+    never played as "Qa4" or as a knight move to d4, and "Bc4" never turns
+    into the pawn move "c4".
+    """
+    san_move = san_move.rstrip("+#")
+    spoken = SAN_PARTS_RE.fullmatch(san_move)
+    if spoken is None:
+        return None
+    piece, destination = spoken.group(1), spoken.group(5, 6)
+    best_uci = None
+    best_distance = max_distance + 1
+    tied = False
+    for candidate, uci in legal_san_index(board_state).items():
+        parts = SAN_PARTS_RE.fullmatch(candidate)
+        if parts is None or parts.group(1) != piece or parts.group(5, 6) != destination:
+            continue
+        distance = edit_distance(san_move, candidate)
+        if distance < best_distance:
+            best_uci, best_distance, tied = uci, distance, False
+        elif distance == best_distance:
+            tied = True
+    if best_uci is None or tied:
+        return None
+    return best_uci
+
+@lru_cache(maxsize=4096)
+def _parse_san_cached(fen, san_move):
+    """UCI for san_move in the position fen via python-chess, or None; retries on the same position hit the cache."""
     try:
-        print(f"DEBUG SAN: Converting '{san_move}' to UCI with board position")
-        
-        # Parse the SAN move using python-chess
-        move = board_state.parse_san(san_move)
-        uci_move = move.uci()
-        
-        print(f"DEBUG SAN: Successfully converted '{san_move}' -> '{uci_move}'")
-        return uci_move
-        
+        return chess.Board(fen).parse_san(san_move).uci()
     except chess.InvalidMoveError as e:
-        print(f"DEBUG SAN: Invalid move '{san_move}': {e}")
-        return None
+        logger.debug("Invalid move '%s': %s", san_move, e)
     except chess.IllegalMoveError as e:
-        print(f"DEBUG SAN: Illegal move '{san_move}': {e}")
-        return None
+        logger.debug("Illegal move '%s': %s", san_move, e)
     except Exception as e:
-        print(f"DEBUG SAN: Error converting '{san_move}': {e}")
-        return None
+        logger.debug("Error converting '%s': %s", san_move, e)
+    return None
+
+def convert_san_to_uci(san_move, board_state):
+    """Convert SAN notation to UCI using python-chess."""
+    logger.debug("Converting '%s' to UCI with board position", san_move)
+    
+    uci_move = legal_san_index(board_state).get(san_move.rstrip("+#"))
+    if uci_move:
+        logger.debug("Successfully converted '%s' -> '%s'", san_move, uci_move)
+        return uci_move
+    
+    # Not the canonical SAN (e.g. over-disambiguated) - let python-chess parse it
+    uci_move = _parse_san_cached(board_state.fen(), san_move)
+    if uci_move:
+        logger.debug("Successfully converted '%s' -> '%s'", san_move, uci_move)
+        return uci_move
+    
+    # Probably a misheard disambiguation - take the one legal move of that piece to that square
+    uci_move = closest_legal_move(san_move, board_state)
+    if uci_move:
+        logger.debug("Fuzzy matched '%s' -> '%s'", san_move, uci_move)
+    return uci_move
+
+# Starting position for callers without a board. Conversion only reads the board
+# (san() pushes and pops internally), so one shared instance is enough.
+_DEFAULT_BOARD = chess.Board()
 
 def parse_chess_notation_san_to_uci(text, board_state=None):
     """
@@ -302,37 +532,35 @@ def parse_chess_notation_san_to_uci(text, board_state=None):
     Returns:
         str or None: UCI move or None if parsing failed
     """
-    print(f"DEBUG SAN: Starting parse for: '{text}'")
-    
-    # Use default starting position if no board provided
-    if board_state is None:
-        board_state = chess.Board()
-        print("DEBUG SAN: Using default starting position for testing")
+    logger.debug("Starting parse for: '%s'", text)
     
     # Handle special commands
     text_lower = text.lower().strip()
-    if 'exit' in text_lower or 'quit' in text_lower:
-        return "EXIT"
-    if "resign" in text_lower:
-        return "resign"
-    if "accept draw" in text_lower:
-        return "accept draw"
-    if "decline draw" in text_lower:
-        return "decline draw"
-    if "draw" in text_lower:
-        return "draw"
+    special = match_special_command(text_lower)
+    if special:
+        return special
     
-    # Convert voice to SAN
-    san_move = parse_voice_to_san(text)
+    # Use default starting position if no board provided
+    if board_state is None:
+        board_state = _DEFAULT_BOARD
+        logger.debug("Using default starting position for testing")
+    
+    # Convert voice to SAN and SAN to UCI, first with the words as spoken:
+    # "cook d4" is the pawn move d4 whenever that is legal
+    san_move = parse_voice_to_san(text, guess_pieces=False)
+    uci_move = convert_san_to_uci(san_move, board_state) if san_move else None
+    if not uci_move:
+        # Only then read a misheard word like "nite" or "nigt" as a piece
+        guessed = parse_voice_to_san(text)
+        if guessed != san_move:
+            san_move = guessed
+            uci_move = convert_san_to_uci(san_move, board_state) if san_move else None
     if not san_move:
-        print("DEBUG SAN: Failed to parse voice to SAN")
+        logger.debug("Failed to parse voice to SAN")
         return None
-    
-    # Convert SAN to UCI
-    uci_move = convert_san_to_uci(san_move, board_state)
     if not uci_move:
-        print("DEBUG SAN: Failed to convert SAN to UCI")
+        logger.debug("Failed to convert SAN to UCI")
         return None
     
-    print(f"DEBUG SAN: Final result: '{text}' -> '{san_move}' -> '{uci_move}'")
+    logger.debug("Final result: '%s' -> '%s' -> '%s'", text, san_move, uci_move)
     return uci_move
@@ -1,24 +1,86 @@
 """Module for parsing game setup voice commands using Deepgram Speech Services"""
+import logging
 import os
-import glob
+import io
+import re
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import pyaudio
-from deepgram import DeepgramClient, PrerecordedOptions, FileSource
-from dotenv import load_dotenv
-from gtts import gTTS
+from deepgram import PrerecordedOptions, FileSource
+from . import _env  # Loads .env once for the whole package
 import pygame
+from ._trie import WordTrie
+from ._vocab import COMMON_WORDS
+from ._deepgram_live import MODEL, LiveListener, record, shared_client, transcription_options
+from ._gtts_session import install_keep_alive
+from ._local_tts import local_engine
+from ._playback import play_and_wait
+from ._tts_cache import synthesize
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Keep one HTTPS connection to Google TTS open for all prompts
+install_keep_alive()
+
+_swept_leftovers = False
+
+# Decoded prompts kept per TTS instance (Sounds die with the mixer, so not module-wide)
+MAX_SOUNDS = 32
+
+# Spoken numbers accepted for time control and increment
+NUMBER_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+    'fifteen': 15, 'twenty': 20, 'thirty': 30,
+    'zero': 0, 'oh': 0
+}
+# A whole word that is a spoken number or a digit string, found in one regex scan
+NUMBER_RE = re.compile(r'(?<!\S)(\d+|' + '|'.join(NUMBER_WORDS) + r')(?!\S)')
+# Short words like "ten" stay exact-only - too many everyday words are one letter away
+NUMBER_TRIE = WordTrie({word: number for word, number in NUMBER_WORDS.items() if len(word) >= 4})
+# A misheard number word only counts on its own or right before its unit
+NUMBER_UNITS = frozenset(['minute', 'minutes', 'second', 'seconds'])
+
+@lru_cache(maxsize=64)
+def _synthesize(text):
+    """MP3 bytes for text; repeated prompts like "Please try again" skip the network and the disk."""
+    return synthesize(text)
+
+# Background synthesis of prompts we already know we'll need
+_PREFETCH_POOL = ThreadPoolExecutor(max_workers=2)
+# Deepgram connections opened while a prompt is still playing
+_CONNECT_POOL = ThreadPoolExecutor(max_workers=1)
+_pending_speech = {}  # text -> Future of its MP3 bytes
+
+def prefetch_speech(texts):
+    """Start synthesizing prompts in the background so speak() finds them ready"""
+    for text in texts:
+        if text not in _pending_speech:
+            _pending_speech[text] = _PREFETCH_POOL.submit(_synthesize, text)
+
+def _speech_audio(text):
+    """MP3 bytes for text, waiting on a prefetch if one is in flight"""
+    future = _pending_speech.pop(text, None)
+    if future is not None:
+        try:
+            return future.result()
+        except Exception as e:
+            logger.warning("Prefetch failed for '%s': %s", text, e)
+    return _synthesize(text)
 
 class DeepgramChallengeTTS:
-    def __init__(self):
+    def __init__(self, model=MODEL, fast=True):
         # Clean up any leftover files from previous runs
         pygame.mixer.init()
-        self.count = 0
-        self.temp_files = []  # Track all created files
-        self.temp_pattern = "temp_speech_"  # Base pattern for temp files
-        self._cleanup_previous_files()
+        self.temp_pattern = "temp_speech_"  # Pattern of speech files written by older versions
+        
+        # Leftovers from a previous run only need sweeping once per process
+        global _swept_leftovers
+        if not _swept_leftovers:
+            self._cleanup_previous_files()
+            _swept_leftovers = True
         
         # Initialize Deepgram Speech Service
         self.api_key = os.getenv('DEEPGRAM_API_KEY')
@@ -26,8 +88,8 @@ class DeepgramChallengeTTS:
         if not self.api_key:
             raise ValueError("DEEPGRAM_API_KEY not found in environment variables")
         
-        # Initialize client (it will automatically use DEEPGRAM_API_KEY from environment)
-        self.client = DeepgramClient()
+        # Shared client (it will automatically use DEEPGRAM_API_KEY from environment)
+        self.client = shared_client()
         
         # Audio settings
         self.RATE = 16000
@@ -35,124 +97,147 @@ class DeepgramChallengeTTS:
         self.CHANNELS = 1
         self.FORMAT = pyaudio.paInt16
         
+        # Recognition settings (fast skips smart formatting and punctuation)
+        self.options = {"model": model, "fast": fast}
+        
+        # Future of the LiveListener the next recognize_speech() will use
+        self._next_listener = None
+        
+        # text -> decoded pygame Sound, most recently played last
+        self._sounds = OrderedDict()
+        
+        # Offline speech (no network round-trip) when LOCAL_TTS is set and pyttsx3 is installed
+        self.local_engine = local_engine()
+        
     def _cleanup_previous_files(self):
         """Clean up any leftover speech files from previous runs"""
-        print("\nCleaning up any leftover TTS files...")
+        logger.debug("Cleaning up any leftover TTS files")
         
-        # Find all temp speech files in the current directory
-        for file in glob.glob(f"temp_speech_*.mp3"):
-            try:
-                if os.path.exists(file):
-                    os.remove(file)
-                    print(f"Removed leftover file: {file}")
-            except Exception as e:
-                print(f"Could not remove leftover file {file}: {e}")
-                
-        # Also check game directory
-        game_dir = os.path.dirname(os.path.abspath(__file__))
-        cwd = os.getcwd()
-        if game_dir != cwd:
-            for file in glob.glob(os.path.join(game_dir, f"{self.temp_pattern}*.mp3")):
-                try:
-                    os.remove(file)
-                    print(f"Removed leftover file: {file}")
-                except Exception as e:
-                    print(f"Could not remove leftover file {file}: {e}")
+        # Sweep the current directory, and the game directory when it differs
+        for directory in {os.getcwd(), os.path.dirname(os.path.abspath(__file__))}:
+            self._sweep(directory)
+        
+    def _sweep(self, directory):
+        """Delete this TTS's speech files in one directory listing"""
+        try:
+            # scandir entries carry their file type, so no extra stat per file
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not (entry.name.startswith(self.temp_pattern) and entry.name.endswith(".mp3")):
+                        continue
+                    if not entry.is_file():
+                        continue
+                    try:
+                        os.unlink(entry.path)
+                        logger.debug("Removed leftover file: %s", entry.path)
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        logger.warning("Could not remove leftover file %s: %s", entry.path, e)
+        except OSError as e:
+            logger.warning("Could not scan %s for leftover files: %s", directory, e)
         
-    def speak(self, text):
-        """Speak text using Google TTS and wait for completion"""
+    def prepare_listening(self):
+        """Open the Deepgram connection for the next recognize_speech() in the background"""
+        if self._next_listener is None:
+            self._next_listener = _CONNECT_POOL.submit(LiveListener, self.client, **self.options)
+        
+    def speak(self, text, expect_reply=False):
+        """
+        Speak text using Google TTS and wait for completion.
+        
+        With expect_reply, the Deepgram connection for the answer is opened
+        while the prompt plays, so listening starts the moment it ends.
+        """
         print(f"\nPrompt: {text}")
+        if expect_reply:
+            self.prepare_listening()
+        if self.local_engine is not None:
+            try:
+                self.local_engine.say(text)
+                self.local_engine.runAndWait()
+                return
+            except Exception as e:
+                logger.warning("Local speech failed (%s), falling back to Google TTS", e)
         try:
-            # Create sequentially numbered temp file
-            temp_file = f"{self.temp_pattern}{self.count}.mp3"
-            self.temp_files.append(temp_file)
-            self.count += 1
-            
-            # Create MP3 file with Google TTS
-            tts = gTTS(text=text, lang='en', slow=False)
-            tts.save(temp_file)
+            sound = self._sound(text)
             
             # Play the audio and wait for it to finish
-            pygame.mixer.music.load(temp_file)
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                pygame.time.Clock().tick(10)
+            play_and_wait(sound)
                 
         except Exception as e:
             print(f"Speech error: {e}")
             
+    def _sound(self, text):
+        """Decoded Sound for text; prompts heard before skip the MP3 decode"""
+        sound = self._sounds.get(text)
+        if sound is not None:
+            self._sounds.move_to_end(text)
+            return sound
+        # Decode the MP3 straight from memory - nothing touches the disk
+        sound = pygame.mixer.Sound(file=io.BytesIO(_speech_audio(text)))
+        self._sounds[text] = sound
+        if len(self._sounds) > MAX_SOUNDS:
+            self._sounds.popitem(last=False)
+        return sound
+        
     def cleanup(self):
-        """Just stop the audio - we'll clean files in the next run"""
-        pygame.mixer.music.stop()
-        pygame.mixer.quit()
-        print("Audio system shutdown complete")
+        """Release this dialog's audio and any unused Deepgram connection"""
+        # Close a connection that was opened for an answer we never listened for
+        pending, self._next_listener = self._next_listener, None
+        if pending is not None:
+            try:
+                pending.result().close()
+            except Exception as e:
+                logger.debug("Unused Deepgram connection: %s", e)
+        # The mixer is shared with GameManager, whose decoded Sounds live for
+        # the whole session, so it stays initialized; only our prompts go
+        self._sounds.clear()
+        logger.debug("Prompt audio released")
         
     def recognize_speech(self, timeout=7):
-        """Capture audio with pyaudio, save as WAV file, then analyze with Deepgram"""
+        """Stream the answer to Deepgram and return it as soon as the user stops speaking"""
         print("\nListening...")
         
+        pending, self._next_listener = self._next_listener, None
         try:
-            # Initialize PyAudio
-            audio = pyaudio.PyAudio()
-            stream = audio.open(
-                format=self.FORMAT,
-                channels=self.CHANNELS,
-                rate=self.RATE,
-                input=True,
-                frames_per_buffer=self.CHUNK
-            )
-            
-            print("Recording...")
-            frames = []
-            
-            # Record for specified duration
-            for _ in range(0, int(self.RATE / self.CHUNK * timeout)):
-                data = stream.read(self.CHUNK)
-                frames.append(data)
-            
-            print("Finished recording.")
-            
-            # Stop and close the stream
-            stream.stop_stream()
-            stream.close()
-            audio.terminate()
-            
-            # Save audio to temporary WAV file
-            import tempfile
-            import wave
-            
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_audio:
-                temp_filename = temp_audio.name
-                
-                # Write WAV file
-                with wave.open(temp_filename, 'wb') as wf:
-                    wf.setnchannels(self.CHANNELS)
-                    wf.setsampwidth(audio.get_sample_size(self.FORMAT))
-                    wf.setframerate(self.RATE)
-                    wf.writeframes(b''.join(frames))
+            listener = pending.result() if pending is not None else LiveListener(self.client, **self.options)
+            transcript, _ = listener.listen(timeout)
+        except Exception as e:
+            # Live streaming unavailable - fall back to record-then-transcribe
+            logger.warning("Streaming recognition failed (%s), falling back to recorded audio", e)
+            return self._recognize_speech_recorded(timeout)
+        
+        if not transcript:
+            print("No speech detected")
+            return None
+        text = transcript.lower().strip()
+        print(f"You said: {text}")
+        return text
+        
+    def _recognize_speech_recorded(self, timeout=7):
+        """Record a fixed window with pyaudio, then analyze it with Deepgram"""
+        try:
+            logger.debug("Recording...")
+            audio_data = record(timeout)
+            logger.debug("Finished recording")
             
-            # Read the audio file and send to Deepgram
-            with open(temp_filename, "rb") as file:
-                buffer_data = file.read()
-
+            # Send the raw PCM straight from memory - no WAV file round-trip
             payload: FileSource = {
-                "buffer": buffer_data,
+                "buffer": bytes(audio_data),
             }
             
             # Configure Deepgram options
             options = PrerecordedOptions(
-                model="nova-3",
-                language="en-US",
-                smart_format=True,
-                punctuate=True,
+                **transcription_options(**self.options),
+                encoding="linear16",
+                sample_rate=self.RATE,
+                channels=self.CHANNELS,
             )
             
             # Send to Deepgram for transcription
             response = self.client.listen.prerecorded.v("1").transcribe_file(payload, options)
             
-            # Clean up temporary file
-            os.unlink(temp_filename)
-            
             # Extract transcription
             if response.results and response.results.channels:
                 transcript = response.results.channels[0].alternatives[0].transcript
@@ -169,14 +254,39 @@ class DeepgramChallengeTTS:
                 
         except Exception as e:
             print(f"Error in speech recognition: {e}")
-            # Try to clean up temp file if it exists
-            try:
-                if 'temp_filename' in locals():
-                    os.unlink(temp_filename)
-            except:
-                pass
             return None
 
+def parse_number(text):
+    """
+    The number in a spoken answer, or None.
+    
+    The first digit string or number word wins. Failing that, a word one
+    letter off a longer number word ("fiften") is accepted, but only when it
+    is the whole answer or comes right before "minutes" or "seconds", and
+    never for everyday words like "give" or "your".
+    """
+    text = text.lower().replace('.', '')
+    # First word that is a digit string or a spoken number wins
+    match = NUMBER_RE.search(text)
+    if match:
+        word = match.group(1)
+        number = NUMBER_WORDS[word] if word in NUMBER_WORDS else int(word)
+        logger.debug("Found number: %s -> %s", word, number)
+        return number
+    
+    # No exact match - tolerate one misheard letter in longer number words
+    words = text.split()
+    for i, word in enumerate(words):
+        if len(word) < 4 or word in COMMON_WORDS:
+            continue
+        if len(words) > 1 and (i + 1 == len(words) or words[i + 1] not in NUMBER_UNITS):
+            continue
+        number = NUMBER_TRIE.lookup(word)
+        if number is not None:
+            logger.debug("Found number word: %s -> %s", word, number)
+            return number
+    return None
+
 def get_number_from_voice(tts):
     """Get a number from voice input using Deepgram Speech"""
     print("\nListening for number...")
@@ -186,24 +296,9 @@ def get_number_from_voice(tts):
         if not text:
             return None
             
-        # Try to extract number
-        if '.' in text:
-            text = text.replace('.', '')
-        words = text.lower().split()
-        for word in words:
-            if word.isdigit():
-                print(f"Found number: {word}")
-                return int(word)
-            # Handle spoken numbers
-            number_map = {
-                'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
-                'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
-                'fifteen': 15, 'twenty': 20, 'thirty': 30,
-                'zero': 0, 'oh': 0
-            }
-            if word in number_map:
-                print(f"Found number word: {word} -> {number_map[word]}")
-                return number_map[word]
+        number = parse_number(text)
+        if number is not None:
+            return number
         
         print("No number found in speech")
         tts.speak("Please say a number clearly")
@@ -227,6 +322,64 @@ def get_yes_no_from_voice(tts):
         tts.speak("Please try again")
         return False
 
+# Asked first so the whole setup can be answered in one breath
+COMBINED_PROMPT = ("Say all four settings at once: minutes per side, rated or casual, "
+                   "seconds increment, and open or private")
+RATED_WORDS = {'rated': True, 'casual': False, 'unrated': False}
+OPEN_WORDS = {'open': True, 'private': False}
+
+# A word before a setting that flips it ("not rated", "non-rated")
+NEGATIONS = frozenset(['not', 'no', 'non'])
+# Number words that are usually filler in a sentence ("oh five minutes")
+FILLER_NUMBERS = frozenset(['oh'])
+ONE_AT_A_TIME = "Okay, let's go one at a time"
+
+def parse_combined_settings(text):
+    """
+    Pick whatever settings a one-utterance answer contains, e.g.
+    "five minutes rated three seconds open". A number followed by minutes
+    is the time control and one followed by seconds the increment; other
+    numbers fill whichever of the two is still missing, in order. Returns
+    only the settings found.
+    """
+    words = text.lower().replace('.', '').replace(',', ' ').replace('-', ' ').split()
+    settings = {}
+    unlabeled = []
+    
+    for i, word in enumerate(words):
+        negated = i > 0 and words[i - 1] in NEGATIONS
+        if word in RATED_WORDS:
+            settings.setdefault('rated', RATED_WORDS[word] != negated)
+        elif word in OPEN_WORDS:
+            settings.setdefault('is_open', OPEN_WORDS[word] != negated)
+        elif word.isdigit() or (word in NUMBER_WORDS and word not in FILLER_NUMBERS):
+            number = int(word) if word.isdigit() else NUMBER_WORDS[word]
+            unit = words[i + 1] if i + 1 < len(words) else ''
+            if unit.startswith('minute'):
+                settings.setdefault('time_control', number)
+            elif unit.startswith('second'):
+                settings.setdefault('increment', number)
+            else:
+                unlabeled.append(number)
+    
+    for key in ('time_control', 'increment'):
+        if key not in settings and unlabeled:
+            settings[key] = unlabeled.pop(0)
+    return settings
+
+def describe_settings(settings):
+    """Spoken summary of the settings given, e.g. "5 minutes, rated, 3 seconds increment, open challenge"."""
+    parts = []
+    if 'time_control' in settings:
+        parts.append(f"{settings['time_control']} minutes")
+    if 'rated' in settings:
+        parts.append("rated" if settings['rated'] else "casual")
+    if 'increment' in settings:
+        parts.append(f"{settings['increment']} seconds increment")
+    if 'is_open' in settings:
+        parts.append("open challenge" if settings['is_open'] else "private challenge")
+    return ", ".join(parts)
+
 def get_game_settings_from_voice():
     """Get game settings through interactive voice dialog using Deepgram Speech"""
     print("\nStarting game setup with Deepgram Speech Services...")
@@ -241,12 +394,30 @@ def get_game_settings_from_voice():
         ("Is this an open challenge?", "is_open", get_yes_no_from_voice)
     ]
     
+    # Synthesize the later questions while the user answers the earlier ones
+    prefetch_speech([COMBINED_PROMPT] + [question for question, _, _ in questions] + ["Please try again", ONE_AT_A_TIME])
+    
     try:
-        # Ask each question in sequence
+        # Happy path: every setting in one answer
+        tts.speak(COMBINED_PROMPT, expect_reply=True)
+        text = tts.recognize_speech(timeout=8)
+        heard = parse_combined_settings(text) if text else {}
+        logger.debug("Settings from combined answer: %s", heard)
+        if heard:
+            # Read the answer back - a misheard word would otherwise go straight into the challenge
+            tts.speak(f"I heard {describe_settings(heard)}. Is that right?", expect_reply=True)
+            if get_yes_no_from_voice(tts):
+                settings.update(heard)
+            else:
+                tts.speak(ONE_AT_A_TIME)
+        
+        # Ask each missing setting in sequence
         for question, setting_key, get_answer_func in questions:
+            if setting_key in settings:
+                continue
             # Try up to 3 times for each question
             for attempt in range(3):
-                tts.speak(question)
+                tts.speak(question, expect_reply=True)
                 answer = get_answer_func(tts)
                 
                 if answer is not None:
@@ -1,11 +1,8 @@
 """Module for asking if user wants to solve puzzles using Deepgram Speech Services"""
 import os
 import time
-from dotenv import load_dotenv
-from game.deepgram_challenge_voice_recognition import DeepgramChallengeTTS
-
-# Load environment variables
-load_dotenv()
+from . import _env  # Loads .env once for the whole package
+from game.deepgram_challenge_voice_recognition import DeepgramChallengeTTS, prefetch_speech
 
 def ask_to_solve_puzzles(game_manager=None):
     """Ask if the user wants to solve chess puzzles using Deepgram Speech Services"""
@@ -14,9 +11,12 @@ def ask_to_solve_puzzles(game_manager=None):
     # Create TTS engine
     tts = DeepgramChallengeTTS()
     
+    # Have the possible replies ready (and cached on disk) before they are needed
+    prefetch_speech(["Please say yes or no clearly", "Goodbye!"])
+    
     try:
         # Ask question
-        tts.speak("Would you like to solve some chess puzzles?")
+        tts.speak("Would you like to solve some chess puzzles?", expect_reply=True)
         print("\nSay 'yes' to solve puzzles or 'no' to quit")
         
         try:
@@ -2,106 +2,132 @@
 Deepgram Speech Services voice recognition module for chess commands.
 """
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pyaudio
-import wave
-import tempfile
-from deepgram import DeepgramClient, PrerecordedOptions, FileSource
-from dotenv import load_dotenv
+from deepgram import PrerecordedOptions, FileSource
+from . import _env  # Loads .env once for the whole package
 from .chess_notation_parser_SAN import parse_chess_notation_san_to_uci
+from ._vocab import CASTLE_DESCRIPTIONS
+from ._deepgram_live import (
+    MODEL, SPEECH_LEVEL, LiveListener, level, open_microphone, record, shared_client, transcription_options
+)
 
-# Load environment variables
-load_dotenv()
+# Deepgram drops a live connection that gets no audio for about ten seconds,
+# so a connection opened ahead of time is only used while it is this fresh
+LISTENER_MAX_IDLE = 5.0
+
+# Opens the next attempt's connection while the current result is handled
+_CONNECT_POOL = ThreadPoolExecutor(max_workers=1)
+
+def _close_unused(future):
+    """Close a pre-opened connection that went stale before it was needed"""
+    try:
+        future.result().close()
+    except Exception:
+        pass
 
 class DeepgramVoiceRecognizer:
-    def __init__(self):
-        """Initialize Deepgram Speech Service"""
+    def __init__(self, model=MODEL, fast=True):
+        """
+        Initialize Deepgram Speech Service
+        
+        Args:
+            model (str): Deepgram model name
+            fast (bool): Skip smart formatting and punctuation for lower latency
+        """
         self.api_key = os.getenv('DEEPGRAM_API_KEY')
         
         if not self.api_key:
             raise ValueError("DEEPGRAM_API_KEY not found in environment variables")
         
-        # Initialize client (it will automatically use DEEPGRAM_API_KEY from environment)
-        self.client = DeepgramClient()
+        # Shared client (it will automatically use DEEPGRAM_API_KEY from environment)
+        self.client = shared_client()
         
         # Audio settings
         self.RATE = 16000
         self.CHUNK = 1024
         self.CHANNELS = 1
         self.FORMAT = pyaudio.paInt16
+        
+        # Recognition settings for every request
+        self.options = {"model": model, "fast": fast}
+        
+        # (opened at, Future of a LiveListener) for the next attempt, if any
+        self._next_listener = None
+
+    def prepare_listening(self):
+        """Open the connection for the next attempt in the background, so a retry streams at once"""
+        if self._next_listener is None:
+            future = _CONNECT_POOL.submit(LiveListener, self.client, **self.options)
+            self._next_listener = (time.monotonic(), future)
+
+    def _take_listener(self):
+        """The pre-opened connection if it is still fresh, otherwise a new one"""
+        pending, self._next_listener = self._next_listener, None
+        if pending is not None:
+            opened_at, future = pending
+            if time.monotonic() - opened_at < LISTENER_MAX_IDLE:
+                try:
+                    return future.result()
+                except Exception as e:
+                    print(f"Pre-opened connection failed ({e}), opening a new one")
+            else:
+                future.add_done_callback(_close_unused)
+        return LiveListener(self.client, **self.options)
+
+    def recognize_move_streaming(self, board_state=None, timeout=5):
+        """
+        Stream microphone audio to Deepgram live transcription and stop as soon
+        as a finalized transcript parses as a move.
+        
+        Interim hypotheses are ignored: "castle" on its own would lock in
+        kingside before "queenside" has been heard.
+        
+        Returns:
+            tuple: (transcript, uci_move) - either may be None
+        """
+        def parse(text):
+            print(f"You said: {text}")
+            return parse_chess_notation_san_to_uci(text, board_state)
+        
+        listener = self._take_listener()
+        listener.accept = parse
+        print("Listening... Say a chess move now!")
+        return listener.listen(timeout)
 
     def recognize_speech_simple(self, timeout=5):
         """
-        Capture audio with pyaudio, save as WAV file, then analyze with Deepgram
+        Record a fixed window with pyaudio, then analyze it with Deepgram
         """
         print("Listening... Say a chess move now!")
         
         try:
-            # Initialize PyAudio
-            audio = pyaudio.PyAudio()
-            stream = audio.open(
-                format=self.FORMAT,
-                channels=self.CHANNELS,
-                rate=self.RATE,
-                input=True,
-                frames_per_buffer=self.CHUNK
-            )
-            
             print("Recording...")
-            frames = []
-            
-            # Record for specified duration
-            for _ in range(0, int(self.RATE / self.CHUNK * timeout)):
-                data = stream.read(self.CHUNK)
-                frames.append(data)
-            
+            audio_data = record(timeout)
             print("Finished recording.")
             
-            # Stop and close the stream
-            stream.stop_stream()
-            stream.close()
-            audio.terminate()
-            
-            # Save audio to temporary WAV file
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_audio:
-                temp_filename = temp_audio.name
-                
-                # Write WAV file
-                with wave.open(temp_filename, 'wb') as wf:
-                    wf.setnchannels(self.CHANNELS)
-                    wf.setsampwidth(audio.get_sample_size(self.FORMAT))
-                    wf.setframerate(self.RATE)
-                    wf.writeframes(b''.join(frames))
-            
-            # Read the audio file and send to Deepgram
-            with open(temp_filename, "rb") as file:
-                buffer_data = file.read()
-
+            # Send the raw PCM straight from memory - no WAV file round-trip
             payload: FileSource = {
-                "buffer": buffer_data,
+                "buffer": bytes(audio_data),
             }
             
             # Configure Deepgram options
             options = PrerecordedOptions(
-                model="nova-3",
-                language="en-US",
-                smart_format=True,
-                punctuate=True,
+                **transcription_options(**self.options),
+                encoding="linear16",
+                sample_rate=self.RATE,
+                channels=self.CHANNELS,
             )
             
             # Send to Deepgram for transcription
             response = self.client.listen.prerecorded.v("1").transcribe_file(payload, options)
             
-            # Clean up temporary file
-            os.unlink(temp_filename)
-            
             # Check if there was any audio activity before showing error messages
-            import struct
-            audio_data = b''.join(frames)
-            samples = struct.unpack('<' + 'h' * (len(audio_data) // 2), audio_data)
-            volume = sum(abs(sample) for sample in samples) / len(samples)
+            volume = level(audio_data)
             
             # Only show error messages if there was actual audio activity
-            if volume > 200:  # Threshold for detecting speech/audio
+            if volume > SPEECH_LEVEL:  # Threshold for detecting speech/audio
                 # Extract transcription
                 if response.results and response.results.channels:
                     transcript = response.results.channels[0].alternatives[0].transcript
@@ -120,12 +146,6 @@ class DeepgramVoiceRecognizer:
                 
         except Exception as e:
             print(f"Error in speech recognition: {e}")
-            # Try to clean up temp file if it exists
-            try:
-                if 'temp_filename' in locals():
-                    os.unlink(temp_filename)
-            except:
-                pass
             return None
 
 def process_chess_command(text, board_state=None):
@@ -135,19 +155,18 @@ def process_chess_command(text, board_state=None):
         
     # Use the new SAN parser with board validation
     move = parse_chess_notation_san_to_uci(text, board_state)
-    
+    report_parsed_move(text, move)
+    return move
+
+def report_parsed_move(text, move):
+    """Print a human-readable interpretation of a parsed move, or hints if parsing failed."""
     if move:
         print(f"✅ Parsed move: '{text}' -> '{move}' (validated against current position)")
         
         # Provide a more human-readable interpretation
-        if move == "e1g1":
-            print("Interpreted as: Castle kingside (white)")
-        elif move == "e1c1":
-            print("Interpreted as: Castle queenside (white)")
-        elif move == "e8g8":
-            print("Interpreted as: Castle kingside (black)")
-        elif move == "e8c8":
-            print("Interpreted as: Castle queenside (black)")
+        castle = CASTLE_DESCRIPTIONS.get(move)
+        if castle:
+            print(f"Interpreted as: {castle}")
         elif len(move) == 4:
             print(f"Interpreted as: Move from {move[0:2]} to {move[2:4]}")
         elif len(move) == 5:  # Promotion
@@ -161,16 +180,52 @@ def process_chess_command(text, board_state=None):
         print("- 'pawn from g takes h5'")
         print("- 'castle kingside'")
         print("- 'pawn to e8 promote to queen'")
+
+# Built on the first move and reused for the rest of the game
+_recognizer = None
+
+def _shared_recognizer():
+    """The recognizer for every move, built on first use (None if Deepgram is not configured)"""
+    global _recognizer
+    if _recognizer is None:
+        try:
+            _recognizer = DeepgramVoiceRecognizer()
+        except Exception as e:
+            print(f"Error initializing Deepgram Speech Recognition: {e}")
+            print("Please check your Deepgram API key in the .env file")
+            return None
+    return _recognizer
+
+def prewarm_move_recognition():
+    """
+    Build the recognizer and open the microphone ahead of the first move.
     
-    return move
+    Meant for a background thread at game start, so the device setup
+    overlaps waiting for the game instead of delaying the first move.
+    """
+    try:
+        if _shared_recognizer() is not None:
+            open_microphone()
+    except Exception as e:
+        print(f"Could not prepare the microphone: {e}")
 
 def get_chess_move_from_voice(board_state=None):
     """Complete process to get a chess move from voice input using Deepgram."""
+    recognizer = _shared_recognizer()
+    if recognizer is None:
+        return None
+    
     try:
-        recognizer = DeepgramVoiceRecognizer()
+        text, move = recognizer.recognize_move_streaming(board_state)
+    except Exception as e:
+        # Live streaming unavailable - fall back to record-then-transcribe
+        print(f"Streaming recognition failed ({e}), falling back to recorded audio")
         text = recognizer.recognize_speech_simple()
         return process_chess_command(text, board_state)
-    except Exception as e:
-        print(f"Error initializing Deepgram Speech Recognition: {e}")
-        print("Please check your Deepgram API key in the .env file")
-        return None 
\ No newline at end of file
+    
+    if text:
+        report_parsed_move(text, move)
+    if move is None:
+        # The caller will most likely listen again straight away
+        recognizer.prepare_listening()
+    return move 
\ No newline at end of file
@@ -1,11 +1,8 @@
 """Module for asking if user wants to play using Deepgram Speech Services"""
 import os
 import time
-from dotenv import load_dotenv
-from game.deepgram_challenge_voice_recognition import DeepgramChallengeTTS
-
-# Load environment variables
-load_dotenv()
+from . import _env  # Loads .env once for the whole package
+from game.deepgram_challenge_voice_recognition import DeepgramChallengeTTS, prefetch_speech
 
 def ask_to_play(game_manager=None):
     """Ask if the user wants to play chess using Deepgram Speech Services"""
@@ -14,9 +11,12 @@ def ask_to_play(game_manager=None):
     # Create TTS engine
     tts = DeepgramChallengeTTS()
     
+    # Have the possible replies ready (and cached on disk) before they are needed
+    prefetch_speech(["Please say yes or no clearly", "You said no to playing chess weirdo!"])
+    
     try:
         # Ask question
-        tts.speak("Would you like to play a game of chess?")
+        tts.speak("Would you like to play a game of chess?", expect_reply=True)
         print("\nSay 'yes' to play or 'no' to quit")
         
         try:
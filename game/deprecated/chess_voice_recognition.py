@@ -1,8 +1,55 @@
 """
 Main module for chess voice recognition functionality.
 """
+from contextlib import contextmanager
+
 import speech_recognition as sr
 from .chess_notation_parser import parse_chess_notation_for_lichess, get_promotion_piece
+from .._vocab import CASTLE_DESCRIPTIONS, match_special_command
+
+# Re-run ambient noise calibration after this many recognitions
+RECALIBRATE_EVERY = 20
+
+# One recognizer and one open microphone stream are reused for the whole session
+_RECOGNIZER = sr.Recognizer()
+_RECOGNIZER.dynamic_energy_threshold = False
+_MIC = None
+_SOURCE = None
+_calls_since_calibration = None
+
+
+@contextmanager
+def _microphone():
+    """Yield the session's microphone source, opening the stream on first use."""
+    global _MIC, _SOURCE
+    if _SOURCE is None:
+        _MIC = sr.Microphone()
+        _SOURCE = _MIC.__enter__()
+    try:
+        yield _SOURCE
+    except OSError:
+        # The stream died (device unplugged etc.) - reopen it next time
+        close_microphone()
+        raise
+
+
+def close_microphone():
+    """Close the cached microphone stream."""
+    global _MIC, _SOURCE
+    if _MIC is not None:
+        try:
+            _MIC.__exit__(None, None, None)
+        except Exception:
+            pass
+    _MIC = None
+    _SOURCE = None
+
+
+def reset_ambient():
+    """Force ambient noise calibration on the next call to recognize_speech."""
+    global _calls_since_calibration
+    _calls_since_calibration = None
+
 
 def recognize_speech(timeout=5, phrase_time_limit=5):
     """
@@ -15,11 +62,15 @@ def recognize_speech(timeout=5, phrase_time_limit=5):
     Returns:
         str or None: Recognized text or None if recognition failed
     """
-    recognizer = sr.Recognizer()
+    global _calls_since_calibration
+    recognizer = _RECOGNIZER
     
-    with sr.Microphone() as source:
-        print("Adjusting for ambient noise... Please wait")
-        recognizer.adjust_for_ambient_noise(source, duration=1)
+    with _microphone() as source:
+        if _calls_since_calibration is None or _calls_since_calibration >= RECALIBRATE_EVERY:
+            print("Adjusting for ambient noise... Please wait")
+            recognizer.adjust_for_ambient_noise(source, duration=1)
+            _calls_since_calibration = 0
+        _calls_since_calibration += 1
         
         print("\nListening... Say a chess move now!")
         try:
@@ -45,18 +96,10 @@ def process_chess_command(text):
     if not text:
         return None
         
-    # Check for exit command
-    if 'exit' in text.lower() or 'quit' in text.lower():
-        return "EXIT"
-    
-    if "resign" in text.lower():
-        return "resign"
-    if "accept draw" in text.lower():
-        return "accept draw"
-    if "decline draw" in text.lower():
-        return "decline draw"
-    if "draw" in text.lower():
-        return "draw"
+    # Check for exit/resign/draw commands
+    special = match_special_command(text.lower())
+    if special:
+        return special
     
     # Try to parse the move
     move = parse_chess_notation_for_lichess(text)
@@ -65,14 +108,9 @@ def process_chess_command(text):
         print(f"This is the format needed for the Lichess API.")
         
         # Provide a more human-readable interpretation
-        if move == "e1g1":
-            print("Interpreted as: Castle kingside (white)")
-        elif move == "e1c1":
-            print("Interpreted as: Castle queenside (white)")
-        elif move == "e8g8":
-            print("Interpreted as: Castle kingside (black)")
-        elif move == "e8c8":
-            print("Interpreted as: Castle queenside (black)")
+        castle = CASTLE_DESCRIPTIONS.get(move)
+        if castle:
+            print(f"Interpreted as: {castle}")
         elif len(move) == 4:
             print(f"Interpreted as: Move from {move[0:2]} to {move[2:4]}")
         elif len(move) == 5:  # Promotion
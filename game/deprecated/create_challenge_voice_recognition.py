@@ -1,52 +1,64 @@
 """Module for parsing game setup voice commands"""
-import speech_recognition as sr
+import logging
 import os
-import glob
-from gtts import gTTS
-import pygame
-import time
+import atexit
+import shutil
+import tempfile
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Speech files kept on disk per TTS instance; older ones are deleted as new ones are made
+MAX_TEMP_FILES = 16
+
+# Spoken numbers as Google returns them at the end of an answer
+NUMBER_MAP = {
+    'one.': 1, '1.': 1, 'two.': 2, '2.': 2, 'three.': 3, '3.': 3, 'four.': 4, '4.': 4, 'five.': 5, '5.': 5,
+    'six.': 6, '6.':6, 'seven.': 7, '7.':7, 'eight.': 8, '8.':8, 'nine.': 9, '9.':9, 'ten.': 10, '10.':10,
+    'fifteen.': 15, '15.':15, 'twenty.': 20, '20.':20, 'thirty.': 30, '30.':30,
+    'zero.': 0, '0.':0, 'oh.': 0
+}
 
 class ChallengeTTS:
     def __init__(self):
-        # Clean up any leftover files from previous runs
-        #self._cleanup_previous_files()
+        # pygame is only imported once a dialog actually needs audio
+        import pygame
+        self._pygame = pygame
         
         # Initialize pygame mixer for audio playback
         pygame.mixer.init()
         self.count = 0
-        self.temp_files = []  # Track all created files
-        self.temp_pattern = "temp_speech_"  # Base pattern for temp files
-        self._cleanup_previous_files()
-    def _cleanup_previous_files(self):
-        """Clean up any leftover speech files from previous runs"""
-        print("\nCleaning up any leftover TTS files...")
+        self.temp_files = deque(maxlen=MAX_TEMP_FILES)  # Most recent speech files still on disk
+        # All speech files live in one private directory, removed as a whole at exit
+        self.temp_dir = tempfile.mkdtemp(prefix="play_chess_tts_")
+        atexit.register(self._final_cleanup)
         
-        # Find all temp speech files in the current directory
-        for file in glob.glob(f"temp_speech_*.mp3"):
-            try:
-                if os.path.exists(file):
-                    os.remove(file)
-                    print(f"Removed leftover file: {file}")
-            except Exception as e:
-                print(f"Could not remove leftover file {file}: {e}")
-                
-        # Also check game directory
-        game_dir = os.path.dirname(os.path.abspath(__file__))
-        cwd = os.getcwd()
-        if game_dir != cwd:
-            for file in glob.glob(os.path.join(game_dir, f"{self.temp_pattern}*.mp3")):
-                try:
-                    os.remove(file)
-                    print(f"Removed leftover file: {file}")
-                except Exception as e:
-                    print(f"Could not remove leftover file {file}: {e}")
+    def _remove_file(self, path):
+        """Delete a speech file, ignoring files that are already gone"""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("Could not remove speech file %s: %s", path, e)
+    
+    def _final_cleanup(self):
+        """Remove this instance's speech directory (runs at exit)"""
+        self.temp_files.clear()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
         
     def speak(self, text):
         """Speak text using Google TTS and wait for completion"""
+        from gtts import gTTS
+        
         print(f"\nPrompt: {text}")
+        pygame = self._pygame
         try:
             # Create sequentially numbered temp file
-            temp_file = f"{self.temp_pattern}{self.count}.mp3"
+            temp_file = os.path.join(self.temp_dir, f"{self.count}.mp3")
+            if len(self.temp_files) == self.temp_files.maxlen:
+                # Delete the oldest file before the deque drops it
+                self._remove_file(self.temp_files[0])
             self.temp_files.append(temp_file)
             self.count += 1
             
@@ -57,17 +69,18 @@ class ChallengeTTS:
             # Play the audio and wait for it to finish
             pygame.mixer.music.load(temp_file)
             pygame.mixer.music.play()
+            # Sleep between checks instead of building a new Clock every iteration
             while pygame.mixer.music.get_busy():
-                pygame.time.Clock().tick(10)
+                pygame.time.wait(20)
                 
         except Exception as e:
             print(f"Speech error: {e}")
             
     def cleanup(self):
         """Just stop the audio - we'll clean files in the next run"""
-        pygame.mixer.music.stop()
-        pygame.mixer.quit()
-        print("Audio system shutdown complete")
+        self._pygame.mixer.music.stop()
+        self._pygame.mixer.quit()
+        logger.debug("Audio system shutdown complete")
 
 def get_number_from_voice(recognizer, source, tts):
     """Get a number from voice input"""
@@ -82,18 +95,13 @@ def get_number_from_voice(recognizer, source, tts):
         words = text.split()
         for word in words:
             if word.isdigit():
-                print(f"Found number: {word}")
+                logger.debug("Found number: %s", word)
                 return int(word)
             # Handle spoken numbers
-            number_map = {
-                'one.': 1, '1.': 1, 'two.': 2, '2.': 2, 'three.': 3, '3.': 3, 'four.': 4, '4.': 4, 'five.': 5, '5.': 5,
-                'six.': 6, '6.':6, 'seven.': 7, '7.':7, 'eight.': 8, '8.':8, 'nine.': 9, '9.':9, 'ten.': 10, '10.':10,
-                'fifteen.': 15, '15.':15, 'twenty.': 20, '20.':20, 'thirty.': 30, '30.':30,
-                'zero.': 0, '0.':0, 'oh.': 0, '0.':0
-            }
-            if word in number_map:
-                print(f"Found number word: {word} -> {number_map[word]}")
-                return number_map[word]
+            number = NUMBER_MAP.get(word)
+            if number is not None:
+                logger.debug("Found number word: %s -> %s", word, number)
+                return number
         
         print("No number found in speech")
         tts.speak("Please say a number clearly")
@@ -117,6 +125,8 @@ def get_yes_no_from_voice(recognizer, source, tts):
 
 def get_game_settings_from_voice():
     """Get game settings through interactive voice dialog"""
+    import speech_recognition as sr
+    
     print("\nStarting game setup...")
     recognizer = sr.Recognizer()
     settings = {}
@@ -135,7 +145,10 @@ def get_game_settings_from_voice():
             # Adjust mic for ambient noise
             print("\nAdjusting for ambient noise...")
             recognizer.adjust_for_ambient_noise(source, duration=1)
-            print("Noise adjustment complete")
+            # Keep the calibrated threshold for every question and end phrases sooner
+            recognizer.dynamic_energy_threshold = False
+            recognizer.pause_threshold = 0.6
+            logger.debug("Noise adjustment complete")
             
             # Ask each question in sequence
             for question, setting_key, get_answer_func in questions:
@@ -1,12 +1,15 @@
 """
 Module for fetching chess puzzles from Lichess API with voice-controlled criteria.
 """
+import json
+import logging
 import os
-import requests
-from dotenv import load_dotenv
+import time
+from concurrent.futures import ThreadPoolExecutor
+from . import _env  # Loads .env once for the whole package
+from ._lichess_session import SESSION
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 class PuzzleFetcher:
     def __init__(self):
@@ -14,9 +17,65 @@ class PuzzleFetcher:
         self.token = os.getenv('LICHESS_API_TOKEN')
         self.base_url = "https://lichess.org/api/puzzle/next"
         
+        # Next puzzle fetched in the background while the current one is solved
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._prefetched = None  # (criteria, Future of puzzle data)
+        
+        # The app's keep-alive connections to lichess.org (token header included)
+        self.session = SESSION
+        if not self.token:
+            print("⚠️ No Lichess API token found - puzzles may be repeated")
+        self.token_valid = None  # Unknown until the first fetch checks it
+        
+    def _verify_token(self):
+        """Check that the token authenticates, once per fetcher; returns True if it does"""
+        if self.token_valid is not None:
+            return self.token_valid
+        self.token_valid = False
+        if not self.token:
+            return False
+        logger.debug("Using authentication token: %s...", self.token[:10])
+        try:
+            test_response = self.session.get("https://lichess.org/api/account")
+            if test_response.status_code == 200:
+                logger.debug("Token is valid and authenticated")
+                self.token_valid = True
+            else:
+                logger.warning("Token may not have puzzle:read scope (status: %s)", test_response.status_code)
+        except Exception as e:
+            logger.warning("Could not verify token permissions: %s", e)
+        return self.token_valid
+        
+    def prefetch(self, difficulty="normal", color=None, theme=None):
+        """Start fetching a puzzle in the background for the next fetch_puzzle call"""
+        criteria = (difficulty, color, theme)
+        self._prefetched = (criteria, self._executor.submit(self._fetch_puzzle, *criteria))
+        
     def fetch_puzzle(self, difficulty="normal", color=None, theme=None):
         """
-        Fetch a random puzzle from Lichess with specified criteria
+        Fetch a random puzzle from Lichess with specified criteria, using the
+        prefetched one when it was requested with the same criteria
+        
+        Args:
+            difficulty (str): "easiest", "easier", "normal", "harder", "hardest"
+            color (str): "white", "black", or None for random
+            theme (str): Puzzle theme (optional)
+            
+        Returns:
+            dict: Puzzle data or None if failed
+        """
+        self._verify_token()
+        prefetched, self._prefetched = self._prefetched, None
+        if prefetched is not None and prefetched[0] == (difficulty, color, theme):
+            puzzle_data = prefetched[1].result()
+            if puzzle_data:
+                logger.debug("Using prefetched puzzle")
+                return puzzle_data
+        return self._fetch_puzzle(difficulty, color, theme)
+        
+    def _fetch_puzzle(self, difficulty="normal", color=None, theme=None):
+        """
+        Request a random puzzle from Lichess with specified criteria
         
         Args:
             difficulty (str): "easiest", "easier", "normal", "harder", "hardest"
@@ -42,57 +101,35 @@ class PuzzleFetcher:
                 params["angle"] = theme
                 
             # Add cache-busting parameter to ensure different puzzles
-            import time
             params["_t"] = int(time.time())
                 
-            # Set up headers with authentication
-            headers = {}
-            if self.token:
-                headers["Authorization"] = f"Bearer {self.token}"
-                print(f"Using authentication token: {self.token[:10]}...")
-                
-                # Test if token has puzzle access
-                try:
-                    test_response = requests.get("https://lichess.org/api/account", headers=headers)
-                    if test_response.status_code == 200:
-                        print("✅ Token is valid and authenticated")
-                    else:
-                        print(f"⚠️ Token may not have puzzle:read scope (status: {test_response.status_code})")
-                except:
-                    print("⚠️ Could not verify token permissions")
-            else:
-                print("⚠️ No Lichess API token found - puzzles may be repeated")
-                
-            print(f"Fetching puzzle with criteria: {params}")
-            print(f"Request URL: {url}")
-            print(f"Full request: {url}?{requests.compat.urlencode(params)}")
+            logger.debug("Fetching puzzle from %s with criteria: %s", url, params)
             
-            # Make the API request
-            response = requests.get(url, params=params, headers=headers)
+            # Make the API request (authentication header comes from the session)
+            response = self.session.get(url, params=params)
             
             if response.status_code == 200:
-                puzzle_data = response.json()
-                print(f"✅ Puzzle fetched successfully!")
-                print(f"Puzzle ID: {puzzle_data['puzzle']['id']}")
-                print(f"Rating: {puzzle_data['puzzle']['rating']}")
-                print(f"Themes: {puzzle_data['puzzle']['themes']}")
+                # Parse the raw bytes - json detects UTF-8 itself, skipping requests' text decoding
+                puzzle_data = json.loads(response.content)
+                puzzle = puzzle_data['puzzle']
+                logger.debug("Puzzle fetched: id=%s rating=%s themes=%s",
+                             puzzle['id'], puzzle['rating'], puzzle['themes'])
                 
                 # Check if we got the same puzzle ID as before
                 if hasattr(self, 'last_puzzle_id'):
-                    if puzzle_data['puzzle']['id'] == self.last_puzzle_id:
-                        print("⚠️ WARNING: Same puzzle ID as before - token may not have puzzle:read scope")
+                    if puzzle['id'] == self.last_puzzle_id:
+                        logger.warning("Same puzzle ID as before - token may not have puzzle:read scope")
                     else:
-                        print("✅ Different puzzle ID - token working correctly")
-                self.last_puzzle_id = puzzle_data['puzzle']['id']
+                        logger.debug("Different puzzle ID - token working correctly")
+                self.last_puzzle_id = puzzle['id']
                 
                 return puzzle_data
             else:
-                print(f"❌ Failed to fetch puzzle: {response.status_code}")
-                print(f"Response: {response.text}")
+                logger.error("Failed to fetch puzzle: %s %s", response.status_code, response.text)
                 return None
                 
         except Exception as e:
-            print(f"❌ Error fetching puzzle: {e}")
+            logger.error("Error fetching puzzle: %s", e)
             return None
             
     def get_puzzle_info(self, puzzle_data):
@@ -114,11 +151,29 @@ class PuzzleFetcher:
             'pgn': game.get('pgn', '')
         }
 
+# Shared across puzzles so the session and token check are reused
+_fetcher = None
+
+def _shared_fetcher():
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = PuzzleFetcher()
+    return _fetcher
+
+def prefetch_puzzle_with_settings(puzzle_settings=None):
+    """Start fetching the puzzle a later fetch_puzzle_with_settings call will ask for"""
+    puzzle_settings = puzzle_settings or {}
+    _shared_fetcher().prefetch(
+        difficulty=puzzle_settings.get('difficulty', 'normal'),
+        color=puzzle_settings.get('color'),
+        theme=puzzle_settings.get('theme')
+    )
+
 def fetch_puzzle_with_settings(puzzle_settings=None):
     """Fetch a puzzle with the given settings"""
     print("\n=== FETCHING PUZZLE ===")
     
-    fetcher = PuzzleFetcher()
+    fetcher = _shared_fetcher()
     
     # Fetch puzzle with settings
     if puzzle_settings:
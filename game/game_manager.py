@@ -2,119 +2,250 @@
 import berserk
 import time
 from .game_state import GameState
+import logging
 import threading
 import queue
-import os
-from gtts import gTTS
+import io
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import pygame
+from ._gtts_session import install_keep_alive
+from ._local_tts import local_engine, local_tts_requested
+from ._playback import play_and_wait
+from ._san_speech import FILES, PIECE_WORDS, RANKS, SYMBOL_WORDS, san_to_words
+from ._tts_cache import synthesize
+
+logger = logging.getLogger(__name__)
+
+# Keep one HTTPS connection to Google TTS open for all announcements
+install_keep_alive()
+
+# Seconds before reopening the incoming event stream after it drops
+EVENT_RECONNECT_DELAY = 5
+
+# Seconds a status message may wait in the speech queue before it is dropped
+STATUS_MAX_AGE = 10
+
+# Draw commands repeated within this many seconds are sent to Lichess once
+DRAW_COMMANDS = ("draw", "accept draw", "decline draw")
+COMMAND_DEBOUNCE = 1.0
+
+# Parallel Google TTS requests for a burst of queued messages
+SYNTH_WORKERS = 3
+
+# Every word a move announcement can be built from: piece names, captures,
+# check, castling, pawn files and the 64 squares
+MOVE_VOCABULARY = (
+    list(PIECE_WORDS.values()) + list(SYMBOL_WORDS.values())
+    + ["Castle kingside", "Castle queenside"]
+    + list(FILES) + list(RANKS)
+    + [f + r for f in FILES for r in RANKS]
+)
+
+
+@lru_cache(maxsize=256)
+def _announcement_audio(text):
+    """MP3 bytes for an announcement; "Check" or "Your turn" are synthesized once, then cached"""
+    return synthesize(text)
 
 class GameManager:
-    def __init__(self, client):
+    def __init__(self, client, enable_tts=True):
+        """enable_tts=False only prints messages (headless runs); audio is never initialized"""
         self.client = client
         self.state = GameState()
-        self.speech_queue = queue.Queue()
+        self.speech_queue = queue.Queue()  # (text, future of its Sounds, expiry), in speaking order
+        self.enqueue_lock = threading.Lock()
+        # Synthesizes queued messages ahead of the playback thread, a few at a time;
+        # the queue keeps them in speaking order whichever finishes first
+        self.synth_pool = ThreadPoolExecutor(max_workers=SYNTH_WORKERS)
         self.speech_thread = None
         self.is_speaking = False
         self.move_thread_active = False
-        self.temp_files = []
-        self.temp_count = 0
+        self.last_command_at = {}  # Draw command -> when it was last sent
+        self.token_sounds = {}  # Decoded Sound for each MOVE_VOCABULARY word
+        # Offline pyttsx3 speech instead of Google TTS (LOCAL_TTS=1)
+        self.use_local_tts = local_tts_requested()
+        # Mixer and speech thread are started by the first message, not here
+        self.enable_tts = enable_tts
+        self.tts_started = False
         
+        # Read Lichess's incoming event stream in the background for the whole session
+        self.incoming_events = queue.Queue()
+        threading.Thread(target=self._event_pump, daemon=True).start()
+
+    def _start_tts(self):
+        """Initialize audio on first use"""
         # Initialize pygame mixer for audio
         pygame.mixer.init()
         
+        # Get the move words ready before the opponent's first move
+        if not self.use_local_tts:
+            threading.Thread(target=self._presynthesize_vocabulary, daemon=True).start()
+        
         # Start speech processing thread
         self.start_speech_thread()
-        
-        # Clean up any leftover temp files
-        self._cleanup_temp_files()
+        self.tts_started = True
 
-    def _cleanup_temp_files(self):
-        """Clean up any leftover speech files from previous runs"""
-        for file in os.listdir():
-            if file.startswith("gm_speech_") and file.endswith(".mp3"):
-                try:
-                    os.remove(file)
-                    print(f"Removed leftover file: {file}")
-                except Exception as e:
-                    print(f"Could not remove leftover file {file}: {e}")
+    def _event_pump(self):
+        """Feed incoming Lichess events (gameStart, challengeDeclined, ...) into incoming_events"""
+        while True:
+            try:
+                for event in self.client.board.stream_incoming_events():
+                    self.incoming_events.put(event)
+                logger.info("Incoming event stream ended, reconnecting...")
+            except Exception as e:
+                logger.warning("Incoming event stream error: %s", e)
+            time.sleep(EVENT_RECONNECT_DELAY)
+
+    def drain_incoming_events(self):
+        """Forget events that arrived before now, e.g. before creating a new seek"""
+        while not self.incoming_events.empty():
+            self.incoming_events.get_nowait()
+
+    def _presynthesize_vocabulary(self):
+        """Synthesize and decode every move word once, so announcing a move needs no network"""
+        for token in MOVE_VOCABULARY:
+            try:
+                self._token_sound(token)
+            except Exception as e:
+                logger.warning("Could not prepare speech for '%s': %s", token, e)
+                return
+        logger.debug("Move vocabulary ready")
+
+    def _token_sound(self, token):
+        """Sound for one word of a move announcement"""
+        sound = self.token_sounds.get(token)
+        if sound is None:
+            sound = pygame.mixer.Sound(file=io.BytesIO(_announcement_audio(token)))
+            self.token_sounds[token] = sound
+        return sound
+
+    def _prepare_sounds(self, item):
+        """Sounds for one queued message: a move's words, or a whole status message"""
+        if isinstance(item, tuple):
+            # A move: stitched together from pre-synthesized words
+            return [self._token_sound(token) for token in item]
+        # Repeated announcements come from memory or the disk cache, not the network
+        logger.debug("Getting speech audio for: %s", item)
+        return [pygame.mixer.Sound(file=io.BytesIO(_announcement_audio(item)))]
 
     def start_speech_thread(self):
         """Start the background speech thread"""
         def speech_worker():
+            # pyttsx3 must be driven from the thread that created it
+            engine = local_engine() if self.use_local_tts else None
+            if self.use_local_tts and engine is None:
+                self.use_local_tts = False
+            
             while True:
                 try:
-                    text = self.speech_queue.get()
-                    if text is None:  # Shutdown signal
+                    entry = self.speech_queue.get()
+                    if entry is None:  # Shutdown signal
                         break
+                    text, pending, expires = entry
+                    if isinstance(text, tuple):
+                        text = " ".join(text)
                     
-                    # Generate a unique temp file name
-                    temp_file = f"gm_speech_{self.temp_count}.mp3"
-                    self.temp_count += 1
-                    self.temp_files.append(temp_file)
+                    # A status message nobody heard in time is no longer worth the wait
+                    if expires is not None and time.monotonic() > expires:
+                        logger.debug("Skipping stale status: %s", text)
+                        continue
                     
-                    print(f"Creating speech file: {temp_file} with text: {text}")
-                    
-                    # Create and save the audio file
-                    tts = gTTS(text=text, lang='en', slow=False)
-                    tts.save(temp_file)
+                    if engine is not None:
+                        try:
+                            engine.say(text)
+                            engine.runAndWait()
+                            continue
+                        except Exception as e:
+                            logger.warning("Local speech failed (%s), falling back to Google TTS", e)
+                    if pending is None:
+                        pending = self.synth_pool.submit(self._prepare_sounds, entry[0])
                     
                     # Ensure mixer is initialized
                     if not pygame.mixer.get_init():
-                        print("Re-initializing pygame mixer")
+                        logger.debug("Re-initializing pygame mixer")
                         pygame.mixer.init()
                     
+                    # Usually ready already: it was synthesized while the previous message played
+                    sounds = pending.result()
+                    
                     # Play the audio with better error handling
                     try:
-                        pygame.mixer.music.load(temp_file)
-                        pygame.mixer.music.play()
-                        print(f"Playing audio: {temp_file}")
+                        logger.debug("Playing audio: %s", text)
                         
                         # Wait for playback to complete
-                        while pygame.mixer.music.get_busy():
-                            pygame.time.Clock().tick(10)
+                        for sound in sounds:
+                            play_and_wait(sound)
                         
-                        print(f"Finished playing: {temp_file}")
+                        logger.debug("Finished playing: %s", text)
                     except Exception as e:
-                        print(f"Pygame audio error: {e}")
+                        logger.warning("Pygame audio error: %s", e)
                     
                 except Exception as e:
-                    print(f"Speech worker error: {e}")
+                    logger.warning("Speech worker error: %s", e)
                 finally:
                     self.speech_queue.task_done()
         
         self.speech_thread = threading.Thread(target=speech_worker, daemon=True)
         self.speech_thread.start()
-        print("Speech thread started")
+        logger.debug("Speech thread started")
+
+    def _enqueue(self, item, status=False):
+        """
+        Start synthesizing item right away and queue it for playback.
+        
+        A status message is skipped when the same one is already waiting last
+        in the queue, and dropped if it waited more than STATUS_MAX_AGE.
+        Moves and game results are always spoken.
+        """
+        if not self.enable_tts:
+            return
+        with self.enqueue_lock:
+            if not self.tts_started:
+                self._start_tts()
+            if status:
+                with self.speech_queue.mutex:
+                    last = self.speech_queue.queue[-1] if self.speech_queue.queue else None
+                if last is not None and last[0] == item:
+                    logger.debug("Already queued: %s", item)
+                    return
+            # The local engine speaks the text directly, nothing to synthesize ahead
+            pending = None if self.use_local_tts else self.synth_pool.submit(self._prepare_sounds, item)
+            expires = time.monotonic() + STATUS_MAX_AGE if status else None
+            self.speech_queue.put((item, pending, expires))
 
     def speak(self, text):
         """Add text to speech queue"""
         print(f"Speaking: {text}")
-        self.speech_queue.put(text)
+        self._enqueue(text)
 
     def speak_status(self, text):
-        """Queue status message for speech"""
-        self.speak(text)
+        """Queue status message for speech (coalesced, may be dropped when stale)"""
+        print(f"Speaking: {text}")
+        self._enqueue(text, status=True)
 
-    def speak_move(self, text):
-        """Queue move for speech"""
-        self.speak(text)
+    def speak_move(self, words):
+        """Queue move for speech, played word by word from the pre-synthesized vocabulary"""
+        self._enqueue(tuple(words))
 
     def wait_for_game_start(self, game_id):
         """Wait for game to start"""
         print(f"\nWaiting for opponent to accept game {game_id}...")
         
-        for event in self.client.board.stream_incoming_events():
-            print(f"Incoming Event: {event}")
+        while True:
+            event = self.incoming_events.get()
+            logger.debug("Incoming event: %r", event)
             if event['type'] == 'gameStart' and event['game']['id'] == game_id:
                 color = event['game']['color']
+                # Fresh moves and board for the new game
+                self.state = GameState()
                 self.state.set_color(color)
                 self.speak_status(f"Game started! You are playing as {color}")
                 return True
-            elif event['type'] == 'challengeDeclined':
+            elif event['type'] == 'challengeDeclined' and event.get('challenge', {}).get('id', game_id) == game_id:
                 print("Challenge was declined!")
                 self.speak_status("Challenge was declined")
                 return False
-        return False
 
     def announce_move(self, move_info):
         """Process and announce a move"""
@@ -123,21 +254,11 @@ class GameManager:
             print("\n=== OPPONENT'S MOVE ===")
             print(f"Move: {move_info}")
             # Format the move for speech
-            speech_text = san_move.replace("N", "night ") #N is knight, but we say night gTTS SUCKS LOL
-            speech_text = speech_text.replace("B", "Bishop ")
-            speech_text = speech_text.replace("R", "Rook ")
-            speech_text = speech_text.replace("Q", "Queen ")
-            speech_text = speech_text.replace("K", "King ")
-            speech_text = speech_text.replace("x", " takes ")
-            speech_text = speech_text.replace("+", " check")
-            speech_text = speech_text.replace("#", " checkmate")
-            speech_text = speech_text.replace("O-O-O", "Castle queenside")
-            speech_text = speech_text.replace("O-O", "Castle kingside")
-
-            print(f"Speaking: {speech_text}")
+            words = san_to_words(san_move)
+            print(f"Speaking: {' '.join(words)}")
             
             # Use move engine for move announcements
-            self.speak_move(speech_text)
+            self.speak_move(words)
 
     def process_game_end(self, end_type, winner):
         """Announce game end conditions"""
@@ -177,7 +298,7 @@ class GameManager:
     def accept_draw(self, game_id):
         """Accept draw offers"""
         try:
-            self.client.board.offer_draw(game_id)
+            self.client.board.accept_draw(game_id)
             self.speak_status("Accepting draw")
             return True
         except Exception as e:
@@ -194,6 +315,15 @@ class GameManager:
             print(f"Error with draw: {e}")
             return False
 
+    def is_repeated_command(self, command):
+        """True for a draw command heard again within COMMAND_DEBOUNCE - one request, not two API calls"""
+        if command not in DRAW_COMMANDS:
+            return False
+        now = time.monotonic()
+        last = self.last_command_at.get(command)
+        self.last_command_at[command] = now
+        return last is not None and now - last < COMMAND_DEBOUNCE
+
     def handle_command(self, game_id, command):
         """Handle non-move commands like resign and draw"""
         if not command:
@@ -240,6 +370,11 @@ class GameManager:
                     # No move detected, continue silently (user might be thinking)
                     continue
                 
+                # A repeat of the draw command just sent - keep listening for a move
+                if self.is_repeated_command(move):
+                    print(f"Ignoring repeated command: {move}")
+                    continue
+                
                 # First check if it's a command
                 command_result = self.handle_command(game_id, move)
                 if command_result is not None:
@@ -269,15 +404,8 @@ class GameManager:
         # Signal speech thread to stop
         if hasattr(self, 'speech_queue'):
             self.speech_queue.put(None)
-        
-        # Clean up temp files
-        if hasattr(self, 'temp_files'):
-            for file in self.temp_files:
-                try:
-                    if os.path.exists(file):
-                        os.remove(file)
-                except Exception as e:
-                    print(f"Error removing temp file: {e}")
+        if hasattr(self, 'synth_pool'):
+            self.synth_pool.shutdown(wait=False)
         
         # Stop pygame mixer
         if pygame.mixer.get_init():
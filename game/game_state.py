@@ -1,15 +1,77 @@
 """Module for managing chess game state"""
+import logging
 import chess
 
+logger = logging.getLogger(__name__)
+
+# Lichess game status -> how the game ended
+STATUS_TO_END = {'mate': 'checkmate', 'resign': 'resign', 'draw': 'draw'}
+GAME_END_KINDS = frozenset(STATUS_TO_END.values())
+
+def _fast_san(board: chess.Board, move: chess.Move) -> str:
+    """
+    SAN for a move Lichess has already validated, without generating every
+    legal move the way board.san() does.
+    
+    Legal moves are only generated for the rare cases that need them: two
+    pieces of the same type that could reach the square, or a check that
+    might be mate.
+    """
+    piece = board.piece_type_at(move.from_square)
+    to_name = chess.square_name(move.to_square)
+    capture = board.is_capture(move)
+    
+    if board.is_castling(move):
+        san = "O-O" if chess.square_file(move.to_square) > chess.square_file(move.from_square) else "O-O-O"
+    elif piece == chess.PAWN:
+        san = to_name
+        if capture:
+            san = chess.FILE_NAMES[chess.square_file(move.from_square)] + "x" + san
+        if move.promotion:
+            san += "=" + chess.piece_symbol(move.promotion).upper()
+    else:
+        # Other pieces of this type that attack the target square (bitboard test)
+        others = board.attackers(board.turn, move.to_square) & board.pieces(piece, board.turn)
+        others.discard(move.from_square)
+        if others:
+            # Disambiguation has to respect pins - let python-chess work it out
+            return board.san(move)
+        san = chess.piece_symbol(piece).upper() + ("x" if capture else "") + to_name
+    
+    board.push(move)
+    try:
+        if board.is_check():
+            san += "#" if board.is_checkmate() else "+"
+    finally:
+        board.pop()
+    return san
+
 class GameState:
+    # Fixed attribute set: read on every streamed event
+    __slots__ = ('my_color', 'moves', 'move_count', 'is_my_turn', 'game_id', 'status', 'board')
+    
+    my_color: str | None
+    moves: str
+    move_count: int
+    is_my_turn: bool
+    game_id: str | None
+    status: str | None
+    board: chess.Board | None
+    
     def __init__(self):
         self.my_color = None
-        self.current_moves = []
+        self.moves = ""  # Lichess's space-separated UCI move list, as last applied
+        self.move_count = 0
         self.is_my_turn = False
         self.game_id = None
         self.status = None
         self.board = None  # Will be initialized when game starts
         
+    @property
+    def current_moves(self):
+        """Moves played so far, as a list of UCI strings"""
+        return self.moves.split()
+
     def set_color(self, color):
         """Set player color and initial turn"""
         self.my_color = color
@@ -24,66 +86,71 @@ class GameState:
         san_move = self.board.san(move)
         return san_move
 
-    def check_game_end(self, event):
+    def check_game_end(self, winner=None):
         """Check if the game has ended"""
-        if self.status == 'mate':
-            return 'checkmate', event.get('winner')
-        elif self.status == 'resign':
-            return 'resign', event.get('winner')
-        elif self.status == 'draw':
-            return 'draw', None
-        return None
+        end = STATUS_TO_END.get(self.status)
+        if end is None:
+            return None
+        # A draw has no winner
+        return end, (None if end == 'draw' else winner)
 
     def update_from_event(self, event):
         """Update state from a game event"""
-        if event['type'] == 'gameState':
-            move_info = None
-            old_turn = self.is_my_turn
-            
-            # Determine turn based on moves and our color
-            moves = event.get('moves', '').split() if event.get('moves') else []
-            num_moves = len(moves)
-            self.is_my_turn = (num_moves % 2 == 0) == (self.my_color == 'white')
-            
-            # Update moves and board state
-            #if moves:  # Only process if there are actual moves
-                # Special case: First move when we're black
-            if len(self.current_moves) == 0 and self.my_color == 'black':
-                last_move = moves[-1]
-                san_move = self.get_san_move(last_move)
-                self.board.push_uci(last_move)
-                self.current_moves = moves
-                move_info = (last_move, san_move)
-            
-            elif len(moves) > len(self.current_moves):
-                last_move = moves[-1]
-                # Don't report our own move as opponent's move
-                if len(self.current_moves) == len(moves) - 1:
-                    is_opponent_move = not self.is_my_turn
-                    
-                    # Process move regardless of whose it is
-                    san_move = self.get_san_move(last_move)
-                    self.board.push_uci(last_move)
-                    self.current_moves = moves
+        match event.get('type'):
+            case 'gameState':
+                # Read each field once into locals
+                moves = event.get('moves') or ''
+                status = event.get('status')
+                winner = event.get('winner')
+                
+                move_info = None
+                # Only look at what was appended since the last event - usually one move
+                applied = self.moves
+                added = moves[len(applied):].split() if moves.startswith(applied) else []
+                if added:
+                    num_moves = self.move_count + len(added)
+                elif moves == applied:
+                    num_moves = self.move_count
+                else:
+                    # A takeback or other rewrite - count the separators (rare)
+                    num_moves = moves.count(' ') + 1 if moves else 0
+                
+                # Determine turn based on moves and our color
+                is_my_turn = (num_moves % 2 == 0) == (self.my_color == 'white')
+                self.is_my_turn = is_my_turn
+                
+                # Update moves and board state with the new moves
+                if added:
+                    board = self.board
+                    # Moves from skipped (coalesced) events are applied silently;
+                    # only the newest one can be announced
+                    for uci_move in added[:-1]:
+                        board.push(chess.Move.from_uci(uci_move))
+                    last_move = added[-1]
+                    # Lichess has already validated the move, so neither the SAN nor
+                    # the push needs python-chess to generate every legal move
+                    move = chess.Move.from_uci(last_move)
+                    san_move = _fast_san(board, move)
+                    board.push(move)
+                    self.moves = moves
+                    self.move_count = num_moves
                     
-                    # Only return move info for opponent moves
-                    move_info = (last_move, san_move) if not is_opponent_move else None
-            
-            # Update game status and check for end conditions
-            self.status = event.get('status')
-            #print(f"the event {event}")
-            #print(f"Game status: {self.status}")
-            game_end = self.check_game_end(event)
-            if game_end:
-                return game_end
+                    # Don't report our own move as opponent's move
+                    move_info = (last_move, san_move) if is_my_turn else None
+                
+                # Update game status and check for end conditions
+                self.status = status
+                logger.debug("Game status: %s", status)
+                game_end = self.check_game_end(winner)
+                if game_end:
+                    return game_end
+                
+                return move_info
             
-            return move_info
-        
-        # Print more info for debugging
-        print(f"Turn: {'ours' if self.is_my_turn else 'opponents'}")
-        if self.current_moves:
-            print(f"Current moves: {' '.join(self.current_moves)}")
-        
-        return None, None
-        
-        return None, None 
\ No newline at end of file
+            case _:
+                # Print more info for debugging
+                logger.debug("Turn: %s", 'ours' if self.is_my_turn else 'opponents')
+                if self.moves:
+                    logger.debug("Current moves: %s", self.moves)
+                
+                return None, None
@@ -2,11 +2,71 @@
 Module for getting puzzle settings through voice interaction using Deepgram Speech Services
 """
 import os
-from dotenv import load_dotenv
-from .deepgram_challenge_voice_recognition import DeepgramChallengeTTS
+import re
+from . import _env  # Loads .env once for the whole package
+from .deepgram_challenge_voice_recognition import DeepgramChallengeTTS, prefetch_speech
 
-# Load environment variables
-load_dotenv()
+# Map spoken words to difficulty levels
+DIFFICULTY_MAP = {
+    'easiest': 'easiest',
+    'easy': 'easiest', 
+    'easier': 'easier',
+    'normal': 'normal',
+    'medium': 'normal',
+    'hard': 'harder',
+    'harder': 'harder',
+    'hardest': 'hardest',
+    'expert': 'hardest'
+}
+
+# Map spoken words to puzzle themes
+THEME_MAP = {
+    'endgame': 'endgame',
+    'end game': 'endgame',
+    'opening': 'opening',
+    'middlegame': 'middlegame',
+    'middle game': 'middlegame',
+    'tactics': 'tactics',
+    'tactic': 'tactics',
+    'checkmate': 'checkmate',
+    'mate': 'checkmate',
+    'sacrifice': 'sacrifice',
+    'sac': 'sacrifice',
+    'fork': 'fork',
+    'pin': 'pin',
+    'skewer': 'skewer',
+    'discovered': 'discovered attack',
+    'discovered attack': 'discovered attack',
+    'deflection': 'deflection',
+    'attraction': 'attraction',
+    'clearance': 'clearance',
+    'interference': 'interference',
+    'blocking': 'blocking',
+    'x-ray': 'x-ray attack',
+    'windmill': 'windmill',
+    'underpromotion': 'underpromotion',
+    'smothered': 'smothered mate',
+    'back rank': 'back rank mate',
+    'backrank': 'back rank mate'
+}
+
+def _words_re(words):
+    """
+    One regex matching any of the given words or phrases as whole words.
+    
+    Longer phrases come first, so "back rank" wins over a shorter key at the
+    same position and one search covers every multi-word key.
+    """
+    alternatives = sorted(words, key=len, reverse=True)
+    return re.compile(r'\b(' + '|'.join(map(re.escape, alternatives)) + r')\b')
+
+DIFFICULTY_RE = _words_re(DIFFICULTY_MAP)
+THEME_RE = _words_re(THEME_MAP)
+COLOR_RE = _words_re(['white', 'black'])
+
+DIFFICULTY_PROMPT = "What difficulty would you like? Say easiest, easier, normal, harder, or hardest"
+COLOR_PROMPT = "Do you want to play as white, black, or random?"
+THEME_PROMPT = "Do you have a specific theme in mind? Say endgame, tactics, checkmate, or skip"
 
 def get_puzzle_difficulty_from_voice(tts):
     """Get puzzle difficulty from voice input"""
@@ -20,24 +80,12 @@ def get_puzzle_difficulty_from_voice(tts):
         text = text.lower().strip().rstrip('.')
         print(f"You said: {text}")
         
-        # Map spoken words to difficulty levels
-        difficulty_map = {
-            'easiest': 'easiest',
-            'easy': 'easiest', 
-            'easier': 'easier',
-            'normal': 'normal',
-            'medium': 'normal',
-            'hard': 'harder',
-            'harder': 'harder',
-            'hardest': 'hardest',
-            'expert': 'hardest'
-        }
         
-        for word in text.split():
-            if word in difficulty_map:
-                difficulty = difficulty_map[word]
-                print(f"Selected difficulty: {difficulty}")
-                return difficulty
+        match = DIFFICULTY_RE.search(text)
+        if match:
+            difficulty = DIFFICULTY_MAP[match.group(1)]
+            print(f"Selected difficulty: {difficulty}")
+            return difficulty
                 
         print("Could not understand difficulty, using normal")
         return "normal"
@@ -58,15 +106,13 @@ def get_puzzle_color_from_voice(tts):
         text = text.lower().strip().rstrip('.')
         print(f"You said: {text}")
         
-        if 'white' in text or 'play as white' in text:
-            print("Selected color: white")
-            return "white"
-        elif 'black' in text or 'play as black' in text:
-            print("Selected color: black")
-            return "black"
-        else:
-            print("No color preference, will be random")
-            return None
+        match = COLOR_RE.search(text)
+        if match:
+            color = match.group(1)
+            print(f"Selected color: {color}")
+            return color
+        print("No color preference, will be random")
+        return None
             
     except Exception as e:
         print(f"Error: {e}")
@@ -84,42 +130,12 @@ def get_puzzle_theme_from_voice(tts):
         text = text.lower().strip().rstrip('.')
         print(f"You said: {text}")
         
-        # Map spoken words to puzzle themes
-        theme_map = {
-            'endgame': 'endgame',
-            'end game': 'endgame',
-            'opening': 'opening',
-            'middlegame': 'middlegame',
-            'middle game': 'middlegame',
-            'tactics': 'tactics',
-            'tactic': 'tactics',
-            'checkmate': 'checkmate',
-            'mate': 'checkmate',
-            'sacrifice': 'sacrifice',
-            'sac': 'sacrifice',
-            'fork': 'fork',
-            'pin': 'pin',
-            'skewer': 'skewer',
-            'discovered': 'discovered attack',
-            'discovered attack': 'discovered attack',
-            'deflection': 'deflection',
-            'attraction': 'attraction',
-            'clearance': 'clearance',
-            'interference': 'interference',
-            'blocking': 'blocking',
-            'x-ray': 'x-ray attack',
-            'windmill': 'windmill',
-            'underpromotion': 'underpromotion',
-            'smothered': 'smothered mate',
-            'back rank': 'back rank mate',
-            'backrank': 'back rank mate'
-        }
         
-        for word in text.split():
-            if word in theme_map:
-                theme = theme_map[word]
-                print(f"Selected theme: {theme}")
-                return theme
+        match = THEME_RE.search(text)
+        if match:
+            theme = THEME_MAP[match.group(1)]
+            print(f"Selected theme: {theme}")
+            return theme
                 
         print("No specific theme recognized, will be random")
         return None
@@ -132,20 +148,22 @@ def get_puzzle_settings_from_voice():
     """Get complete puzzle settings through voice interaction"""
     print("\n=== PUZZLE SETTINGS VOICE SETUP ===")
     
+    # Later prompts synthesize (or load from the disk cache) while the first is asked
+    prefetch_speech([DIFFICULTY_PROMPT, COLOR_PROMPT, THEME_PROMPT])
     tts = DeepgramChallengeTTS()
     settings = {}
     
     try:
         # Ask for difficulty
-        tts.speak("What difficulty would you like? Say easiest, easier, normal, harder, or hardest")
+        tts.speak(DIFFICULTY_PROMPT, expect_reply=True)
         settings['difficulty'] = get_puzzle_difficulty_from_voice(tts)
         
         # Ask for color preference
-        tts.speak("Do you want to play as white, black, or random?")
+        tts.speak(COLOR_PROMPT, expect_reply=True)
         settings['color'] = get_puzzle_color_from_voice(tts)
         
         # Ask for theme (optional)
-        tts.speak("Do you have a specific theme in mind? Say endgame, tactics, checkmate, or skip")
+        tts.speak(THEME_PROMPT, expect_reply=True)
         settings['theme'] = get_puzzle_theme_from_voice(tts)
         
         print(f"\nFinal puzzle settings: {settings}")
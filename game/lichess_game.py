@@ -1,29 +1,41 @@
 """
 Module for managing a Lichess game with voice control.
 """
+import logging
 import os
 import berserk
-from dotenv import load_dotenv
-from .deepgram_voice_recognition import get_chess_move_from_voice
+from . import _env  # Loads .env once for the whole package
+from .deepgram_voice_recognition import get_chess_move_from_voice, prewarm_move_recognition
 from .deepgram_challenge_voice_recognition import get_game_settings_from_voice
 from .game_manager import GameManager
+from .game_state import GAME_END_KINDS
+from ._fast_json import install_fast_json
+from ._lichess_session import SESSION
 import time
 from .deepgram_would_you_like_to_play_voice_recognition import ask_to_play
 from .deepgram_do_you_want_solve_puzzles import ask_to_solve_puzzles
 from .get_puzzle_type_from_voice import get_puzzle_settings_from_voice
 from .fetch_type_of_puzzle import fetch_puzzle_with_settings
 from .play_puzzle import play_puzzle_main
+import queue
 import threading
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Streamed game events are parsed with orjson when it is available
+install_fast_json()
+
 TOKEN = os.getenv('LICHESS_API_TOKEN')
 OPPONENT = os.getenv('LICHESS_OPPONENT')
+SEEK_URL = "https://lichess.org/api/board/seek"
+
+# Seconds between "still waiting" updates while an open seek has no taker
+SEEK_STATUS_INTERVAL = 30
 
 class LichessVoiceGame:
     def __init__(self):
-        # Initialize Lichess client
-        self.session = berserk.TokenSession(TOKEN)
+        # Initialize Lichess client on the shared, pooled session
+        self.session = SESSION
         self.client = berserk.Client(self.session)
         self.game_manager = GameManager(self.client)
         
@@ -60,35 +72,57 @@ class LichessVoiceGame:
         """Create an open challenge on Lichess"""
         print("\nCreating an open challenge...")
         self.game_manager.speak_status("Creating open challenge")
-        print("Finished speaking status")
+        
+        # Only a gameStart that arrives after the seek is ours
+        self.game_manager.drain_incoming_events()
+        
+        seek = None
         try:
-            # Create the seek - this returns how long it took
-            seek_time = self.client.board.seek(
-                time=settings.get('time_control', 5),
-                increment=settings.get('increment', 3),
-                rated=settings.get('rated', False),
-                variant='standard',
-                color='random'
-            )
-            print(f"Seek created in {seek_time} seconds")
+            # A seek stays open only while its response is read, so read it on a
+            # background thread; closing the response cancels the seek
+            seek = self.session.post(SEEK_URL, data={
+                "rated": str(bool(settings.get('rated', False))).lower(),
+                "time": settings.get('time_control', 5),
+                "increment": settings.get('increment', 3),
+                "variant": 'standard',
+                "color": 'random',
+            }, stream=True)
+            seek.raise_for_status()
+            threading.Thread(target=self._keep_seek_open, args=(seek,), daemon=True).start()
+            print("Seek created")
             
             # Now listen for someone to accept
             print("Waiting for opponent...")
-            for event in self.client.board.stream_incoming_events():
-                print(f"Event received: {event}")
+            while True:
+                try:
+                    event = self.game_manager.incoming_events.get(timeout=SEEK_STATUS_INTERVAL)
+                except queue.Empty:
+                    print("Still waiting for an opponent...")
+                    self.game_manager.speak_status("Still waiting for an opponent")
+                    continue
+                logger.debug("Event received: %r", event)
                 if event.get('type') == 'gameStart':
                     print("Game starting!")
                     return event['game']['id']
         except KeyboardInterrupt:
             print("\nCancelling seek...")
-            self.client.board.cancel_seek()  # Cancel the seek
             return None
         except Exception as e:
             print(f"Error in seek: {e}")
-            self.client.board.cancel_seek()  # Cancel on error too
             return None
-        
-        return None
+        finally:
+            # Takes the seek off the board if nobody accepted it
+            if seek is not None:
+                seek.close()
+
+    @staticmethod
+    def _keep_seek_open(seek):
+        """Read a seek's response until the game starts or the seek is cancelled"""
+        try:
+            for _ in seek.iter_lines():
+                pass
+        except Exception as e:
+            logger.debug("Seek stream closed: %s", e)
 
     def _create_direct_challenge(self, settings):
         """Create a direct challenge to a specific player"""
@@ -108,6 +142,9 @@ class LichessVoiceGame:
     def play_game(self, game_id):
         """Play a game using voice commands"""
         print("=== Starting play_game ===")
+        # Microphone and recognizer get ready while we wait for the opponent
+        threading.Thread(target=prewarm_move_recognition, daemon=True).start()
+        
         if not self.game_manager.wait_for_game_start(game_id):
             print("Game didn't start")
             return
@@ -116,41 +153,37 @@ class LichessVoiceGame:
         time.sleep(0.5)
         
         move_thread = None
+        stop = threading.Event()
+        events = queue.Queue()
+        threading.Thread(
+            target=self._pump_game_state, args=(game_id, events, stop), daemon=True
+        ).start()
         
         try:
-            for event in self.client.board.stream_game_state(game_id):
-                print("\n========== EVENT DETAILS ==========")
-                print(f"Event type: {event.get('type')}")
-                print(f"Full event structure: {event}")
+            for event in self._latest_events(events):
+                logger.debug("Event type: %s, full event: %r", event.get('type'), event)
                 
                 result = self.game_manager.state.update_from_event(event)
-                print(f"Update result: {result}")
+                logger.debug("Update result: %s", result)
                 
                 if isinstance(result, tuple):
-                    if result[0] in ['checkmate', 'resign', 'draw']:
+                    if result[0] in GAME_END_KINDS:
                         print("=== GAME END DETECTED ===")
                         print(f"End type: {result[0]}")
                         print(f"Winner: {result[1]}")
                         
-                        print("Starting thread cleanup...")
                         self.game_manager.stop_move_thread()
-                        print("Stop thread flag set")
-                        
                         if move_thread and move_thread.is_alive():
-                            print("Thread is alive, joining...")
+                            logger.debug("Joining move thread")
                             move_thread.join(timeout=1.0)
-                            print("Thread joined")
-                        else:
-                            print("No active thread to clean up")
                         
                         self.game_manager.process_game_end(result[0], result[1])
-                        print("Game end processed")
                         time.sleep(2)
                         print("=== EXITING GAME ===")
                         return
                     else:
+                        # Only queues the announcement; the speech thread plays it
                         self.game_manager.announce_move(result)
-                        time.sleep(0.5)
                 
                 # Start or stop move thread based on turn
                 if self.game_manager.state.is_my_turn:
@@ -168,18 +201,67 @@ class LichessVoiceGame:
                         move_thread.join(timeout=1.0)
                         move_thread = None
         finally:
-            print("Stopping move thread")
+            # The pump closes the game stream once it sees this
+            stop.set()
+            logger.debug("Stopping move thread")
             self.game_manager.stop_move_thread()
             if move_thread and move_thread.is_alive():
                 move_thread.join(timeout=1.0)
 
+    def _pump_game_state(self, game_id, events, stop):
+        """Read the game stream on its own thread so play_game can skip states that piled up"""
+        stream = self.client.board.stream_game_state(game_id)
+        try:
+            for event in stream:
+                if stop.is_set():
+                    break
+                events.put(event)
+        except Exception as e:
+            logger.warning("Game stream error: %s", e)
+        finally:
+            # Close the game stream now rather than whenever the generator is collected
+            stream.close()
+            events.put(None)  # End of stream
+
+    @staticmethod
+    def _latest_events(events):
+        """
+        Yield streamed events in order, but only the newest of several
+        gameState events that queued up while the last one was handled.
+        
+        Each gameState carries the full move list, so the newest one alone
+        brings the board up to date.
+        """
+        while True:
+            event = events.get()
+            # Take whatever else has already arrived, without waiting
+            batch = [event]
+            while True:
+                try:
+                    batch.append(events.get_nowait())
+                except queue.Empty:
+                    break
+            for i, event in enumerate(batch):
+                if event is None:
+                    return
+                following = batch[i + 1] if i + 1 < len(batch) else None
+                if event.get('type') == 'gameState' and following is not None and following.get('type') == 'gameState':
+                    logger.debug("Skipping superseded game state")
+                    continue
+                yield event
+
 def main():
-    # """Main function to start and play games"""
-    # game = LichessVoiceGame()
+    """Main function to start and play games"""
+    # Diagnostics stay quiet unless LOG_LEVEL=DEBUG is set
+    logging.basicConfig(
+        level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    
+    # One client, speech thread and event stream for every game this session
+    game = LichessVoiceGame()
     
     while True:
-        """Main function to start and play games"""
-        game = LichessVoiceGame()
         print("\n=== CHESS VOICE COMMAND CENTER ===")
         
         # Ask if they want to play
@@ -12,6 +12,7 @@ import os
 from .deepgram_voice_recognition import get_chess_move_from_voice, DeepgramVoiceRecognizer
 from .deepgram_challenge_voice_recognition import DeepgramChallengeTTS
 from .chess_notation_parser_SAN import parse_chess_notation_san_to_uci
+from ._san_speech import san_to_words
 
 class PuzzlePlayer:
     def __init__(self):
@@ -66,6 +67,12 @@ class PuzzlePlayer:
         print(f"🎯 Using theme: {theme} (index: {self.current_theme_index - 1})")
         return theme
     
+    def peek_next_theme(self):
+        """The theme get_next_theme() will return next, without advancing the cycle"""
+        if self.debug_mode and self.is_first_puzzle:
+            return None
+        return self.theme_cycle[self.current_theme_index]
+    
     def get_theme_stats(self):
         """Get statistics about theme usage"""
         return {
@@ -490,7 +497,8 @@ class PuzzlePlayer:
                     
                     # Tell the user what the opponent played
                     print(f"Opponent plays: {opponent_san}")
-                    self.tts.speak(f"Opponent plays {opponent_san}")
+                    # Spoken as words: gTTS reads raw SAN like "Nxe5" letter by letter
+                    self.tts.speak(f"Opponent plays {' '.join(san_to_words(opponent_san))}")
                 else:
                     print("🎉 Puzzle solved!")
                     self.tts.speak("Congratulations! You solved the puzzle!")
@@ -505,7 +513,7 @@ class PuzzlePlayer:
     def do_another_puzzle_question(self):
         """Ask if user wants to do another puzzle and return True/False"""
         print("\n🎤 Listening for your response...")
-        self.tts.speak("Would you like to solve another puzzle?")
+        self.tts.speak("Would you like to solve another puzzle?", expect_reply=True)
         
         # Get response from voice using TTS engine directly
         try:
@@ -564,12 +572,17 @@ def play_puzzle_main(puzzle_settings):
             print(f"📊 Theme Stats: {stats['themes_used']}/{stats['total_themes']} themes used")
         
         # Fetch a new puzzle with the current theme
-        from .fetch_type_of_puzzle import fetch_puzzle_with_settings
+        from .fetch_type_of_puzzle import fetch_puzzle_with_settings, prefetch_puzzle_with_settings
         puzzle_data = fetch_puzzle_with_settings(enhanced_settings)
         
         if not puzzle_data:
             print("❌ Failed to fetch puzzle")
             return False
+        
+        # Fetch the next puzzle while this one is being solved
+        next_settings = puzzle_settings.copy() if puzzle_settings else {}
+        next_settings['theme'] = player.peek_next_theme()
+        prefetch_puzzle_with_settings(next_settings)
             
         result = player.play_puzzle(puzzle_data)
         if result == False:
@@ -0,0 +1,54 @@
+"""
+Tests for reading game settings out of spoken answers.
+"""
+from game.deepgram_challenge_voice_recognition import describe_settings, parse_combined_settings, parse_number
+
+def test_numbers():
+    """Spoken and written numbers, and number words one letter off"""
+    assert parse_number("five") == 5
+    assert parse_number("10 minutes") == 10
+    assert parse_number("fiften") == 15
+    assert parse_number("fiften minutes") == 15
+
+def test_everyday_words_are_not_numbers():
+    """Words close to a number word don't count as one"""
+    for text in ["your", "hour", "give", "live", "even", "weight", "height",
+                 "give me a moment", "what was the question"]:
+        assert parse_number(text) is None, text
+
+def test_misheard_number_needs_its_slot():
+    """A misheard number word in a longer answer needs a unit after it"""
+    assert parse_number("fiften please") is None
+
+def test_combined_settings():
+    """All four settings in one answer"""
+    assert parse_combined_settings("five minutes rated three seconds open") == {
+        'time_control': 5, 'rated': True, 'increment': 3, 'is_open': True}
+    assert parse_combined_settings("3 seconds increment, 10 minutes, casual, private") == {
+        'increment': 3, 'time_control': 10, 'rated': False, 'is_open': False}
+    assert parse_combined_settings("ten and five") == {'time_control': 10, 'increment': 5}
+
+def test_combined_settings_filler_is_not_a_number():
+    """A spoken "oh" is filler, not a zero-minute game"""
+    settings = parse_combined_settings("oh five minutes rated three seconds open")
+    assert settings['time_control'] == 5
+    assert settings['increment'] == 3
+
+def test_combined_settings_negation():
+    """Saying "not" or "no" in front of a setting flips it"""
+    assert parse_combined_settings("10 minutes not rated 5 seconds")['rated'] is False
+    assert parse_combined_settings("non-rated")['rated'] is False
+    assert parse_combined_settings("no open challenge")['is_open'] is False
+    assert parse_combined_settings("not private")['is_open'] is True
+
+def test_describe_settings():
+    """The read-back names only what was heard"""
+    assert describe_settings({'time_control': 5, 'rated': False}) == "5 minutes, casual"
+    assert describe_settings({'time_control': 5, 'rated': True, 'increment': 3, 'is_open': False}) == (
+        "5 minutes, rated, 3 seconds increment, private challenge")
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
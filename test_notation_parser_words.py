@@ -0,0 +1,70 @@
+"""
+Tests for how the SAN parser treats imperfect input.
+Misheard chess words should still be understood, while everyday filler
+around a move must not turn into a piece, file or capture, and a move
+that is not legal must never be swapped for one to another square.
+"""
+import chess
+from game.chess_notation_parser_SAN import parse_chess_notation_san_to_uci
+
+def board_after(*san_moves):
+    """Board after playing the given SAN moves from the starting position"""
+    board = chess.Board()
+    for san in san_moves:
+        board.push_san(san)
+    return board
+
+def test_filler_words_stay_filler():
+    """Words that sound like a piece or file never replace what was said"""
+    assert parse_chess_notation_san_to_uci("i want pawn to e4") == "e2e4"
+    assert parse_chess_notation_san_to_uci("going to move pawn to e4") == "e2e4"
+    assert parse_chess_notation_san_to_uci("i need pawn e4") == "e2e4"
+    assert parse_chess_notation_san_to_uci("tell me pawn e4") == "e2e4"
+    assert parse_chess_notation_san_to_uci("ok again queen h5", board_after("e4", "e5")) == "d1h5"
+    assert parse_chess_notation_san_to_uci("let me take e5", board_after("e4", "a6")) == "e4e5"
+
+def test_sound_alike_words_keep_the_pawn_move():
+    """A word that only sounds or is spelled like a piece never replaces a legal pawn move"""
+    board = board_after("e4", "e5", "Nf3", "Nc6")
+    for text in ["cane d4", "coin d4", "cook d4", "crook d4", "bishops d4",
+                 "bishop's d4", "knights to d4", "queer d4"]:
+        assert parse_chess_notation_san_to_uci(text, board) == "d2d4", text
+    assert parse_chess_notation_san_to_uci("cane e4") == "e2e4"
+    assert parse_chess_notation_san_to_uci("cook e4") == "e2e4"
+    assert parse_chess_notation_san_to_uci("bishops e4") == "e2e4"
+
+def test_one_letter_off_words_stay_filler():
+    """Everyday words one letter away from a chess word are not read as one"""
+    assert parse_chess_notation_san_to_uci("look knight to f3") == "g1f3"
+    assert parse_chess_notation_san_to_uci("green light pawn e4") == "e2e4"
+    assert parse_chess_notation_san_to_uci("took pawn to e4") == "e2e4"
+    assert parse_chess_notation_san_to_uci("kind of pawn to d4") == "d2d4"
+    assert parse_chess_notation_san_to_uci("gold pawn h4") == "h2h4"
+    assert parse_chess_notation_san_to_uci("look to f3") == "f2f3"
+
+def test_misheard_chess_words():
+    """Chess words that came back slightly wrong still parse in their slot"""
+    # Guessed as a piece only when the pawn move to that square isn't legal
+    assert parse_chess_notation_san_to_uci("nite to f3", board_after("f4", "e5")) == "g1f3"
+    assert parse_chess_notation_san_to_uci("nite to f3") == "f2f3"
+    assert parse_chess_notation_san_to_uci("bisop to b5", board_after("e4", "e5")) == "f1b5"
+    assert parse_chess_notation_san_to_uci("nigt to f3", board_after("f4", "e5")) == "g1f3"
+    assert parse_chess_notation_san_to_uci("nigt to f3") == "f2f3"
+    assert parse_chess_notation_san_to_uci("hotell four") == "h2h4"
+
+def test_near_miss_keeps_destination():
+    """An unplayable move is only corrected in its disambiguation"""
+    # Qd4 is blocked; Qa4 is one edit away but lands somewhere else
+    assert parse_chess_notation_san_to_uci("queen d4", board_after("c3", "e5")) is None
+    assert parse_chess_notation_san_to_uci("bishop f3") is None
+    # Only a knight can reach d4, but a queen was asked for
+    assert parse_chess_notation_san_to_uci("queen d4", board_after("e4", "e5", "Nf3", "Nc6")) is None
+    assert parse_chess_notation_san_to_uci("rooks to d1", chess.Board("4k3/8/8/8/8/8/R7/4K3 w - - 0 1")) is None
+    assert parse_chess_notation_san_to_uci("knight back to g1", board_after("Nf3", "e5", "Ng5", "d5")) is None
+    assert parse_chess_notation_san_to_uci("knight from g to d2", board_after("d4", "d5")) == "b1d2"
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")